@@ -0,0 +1,139 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+# Parity and speed of batched bone animation conversion against the per key reference path
+# Usage: blender --background --factory-startup --python benchmarks/bone_anim_bench.py
+
+import os
+import sys
+import time
+
+import bpy
+import numpy as np
+from mathutils import Quaternion
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from io_scene_gltf2_importer.node import Node
+
+KEYS = 5000
+BONES = 4
+
+# Max error allowed between batched and per key conversions (1 - |dot| for rotations)
+TOLERANCE = {'translation': 1e-4, 'rotation': 1e-6, 'scale': 1e-4}
+
+class BenchScene():
+    def __init__(self):
+        self.nodes = {}
+
+class BenchGltf():
+    def __init__(self):
+        self.scene = BenchScene()
+        self.import_settings = {'bone_anim_per_key': False}
+
+class BenchAnimation():
+    def __init__(self):
+        self.name = None
+
+class BenchChannel():
+    def __init__(self, path, values, tangents):
+        self.path = path
+        self.times = np.arange(len(values), dtype=np.float32) / 24.0
+        self.values = values
+        self.interpolation = 'CUBICSPLINE'
+        self.in_tangents, self.out_tangents = tangents
+        self.anim = BenchAnimation()
+
+def create_armature(rng):
+    scene = bpy.context.scene
+    armature = bpy.data.armatures.new("bench")
+    obj = bpy.data.objects.new("bench", armature)
+    scene.objects.link(obj)
+    scene.objects.active = obj
+
+    bpy.ops.object.mode_set(mode="EDIT")
+    parent = None
+    for i in range(BONES):
+        bone = armature.edit_bones.new("Bone_" + str(i))
+        bone.head = rng.uniform(-1, 1, 3)
+        bone.tail = bone.head + rng.uniform(0.5, 1, 3)
+        bone.roll = rng.uniform(-3, 3)
+        bone.parent = parent
+        parent = bone
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+    return obj
+
+def random_keys(rng, path):
+    if path == "translation":
+        return rng.uniform(-2, 2, (KEYS, 3)).astype(np.float32)
+    if path == "rotation":
+        q = rng.normal(size=(KEYS, 4))
+        return (q / np.linalg.norm(q, axis=1)[:, np.newaxis]).astype(np.float32)
+    # Non uniform, non unit scales, for bones with and without parent
+    return rng.uniform(0.5, 2, (KEYS, 3)).astype(np.float32)
+
+def error(path, reference, values):
+    if path == "rotation":
+        # q and -q are the same rotation
+        return np.max(1.0 - np.abs(np.sum(reference * values, axis=1)))
+    return np.max(np.abs(reference - values))
+
+def tangents_error(path, reference, values, reference_tangents, tangents):
+    # Both conversions keep quaternions continuous, but may start from opposite signs
+    sign = 1.0
+    if path == "rotation" and np.dot(reference[0], values[0]) < 0.0:
+        sign = -1.0
+    return max(np.max(np.abs(reference_tangents[0] * sign - tangents[0])), np.max(np.abs(reference_tangents[1] * sign - tangents[1])))
+
+rng = np.random.RandomState(0)
+obj = create_armature(rng)
+gltf = BenchGltf()
+delta = Quaternion((0.7071068286895752, 0.7071068286895752, 0.0, 0.0))
+
+# Chain of bones: Bone_1 has parent index 0, which must take the parented path
+for i in range(BONES):
+    node = Node(i, {}, gltf, i == 0, gltf.scene)
+    node.is_joint = True
+    node.blender_bone_name = "Bone_" + str(i)
+    node.parent = i - 1 if i > 0 else None
+    gltf.scene.nodes[i] = node
+
+for i in range(BONES):
+    node = gltf.scene.nodes[i]
+    bone = obj.pose.bones[node.blender_bone_name]
+    for path in ["translation", "rotation", "scale"]:
+        anim = BenchChannel(path, random_keys(rng, path), (0.1 * random_keys(rng, path), 0.1 * random_keys(rng, path)))
+
+        start = time.perf_counter()
+        reference, reference_tangents = node.convert_bone_anim_per_key(obj, bone, anim, delta)
+        per_key_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        values, tangents = node.convert_bone_anim(obj, bone, anim, delta)
+        batched_time = time.perf_counter() - start
+
+        max_error = error(path, reference, values)
+        max_tangents_error = tangents_error(path, reference, values, reference_tangents, tangents)
+        print("%s %-11s : max error %.2e, tangents %.2e, per key %.3fs, batched %.4fs" % (node.blender_bone_name, path, max_error, max_tangents_error, per_key_time, batched_time))
+        assert max_error <= TOLERANCE[path], node.blender_bone_name + " " + path + ": batched conversion differs from per key reference"
+        assert max_tangents_error <= 1e-4, node.blender_bone_name + " " + path + ": batched tangents differ from per key reference"
+
@@ -0,0 +1,91 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+# Compare bulk mesh creation against the previous from_pydata path, on synthetic grids
+# Usage: blender --background --factory-startup --python benchmarks/mesh_bench.py
+
+import os
+import sys
+import time
+
+import bpy
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from io_scene_gltf2_importer.mesh import Mesh
+
+GRID_SIZES = [100, 300, 1000]
+PRIMITIVES = 4
+
+class SyntheticMaterial():
+    def __init__(self):
+        self.blender_material = bpy.data.materials.new("bench").name
+
+class SyntheticPrimitive():
+    def __init__(self, size, origin):
+        x, z = np.meshgrid(np.arange(size, dtype=np.float32), np.arange(size, dtype=np.float32))
+        positions = np.stack((x.ravel() + origin, np.zeros(size * size, dtype=np.float32), z.ravel()), axis=1)
+
+        # two triangles per grid quad
+        quads = (np.arange(size - 1)[None, :] + size * np.arange(size - 1)[:, None]).ravel()
+        indices = np.stack((quads, quads + size, quads + 1, quads + 1, quads + size, quads + size + 1), axis=1)
+
+        self.attributes = {'POSITION': {'result': positions}}
+        self.indices = indices.ravel().astype(np.uint32)
+        self.mat = SyntheticMaterial()
+
+def create_from_pydata(primitives):
+    # Previous path: Python lists of vertices and faces
+    mesh = bpy.data.meshes.new("from_pydata")
+    verts = []
+    faces = []
+    for prim in primitives:
+        current_length = len(verts)
+        verts.extend([[vert[0], -vert[2], vert[1]] for vert in prim.attributes['POSITION']['result']])
+        for i in range(0, len(prim.indices), 3):
+            faces.append(tuple([y + current_length for y in prim.indices[i:i+3]]))
+
+    mesh.from_pydata(verts, [], faces)
+    mesh.validate()
+    return mesh
+
+def create_bulk(primitives):
+    mesh = Mesh(0, {'primitives': []}, None)
+    mesh.primitives = primitives
+    return mesh.blender_create("bulk")
+
+def bench(func, primitives):
+    start = time.perf_counter()
+    mesh = func(primitives)
+    elapsed = time.perf_counter() - start
+    result = (elapsed, len(mesh.vertices), len(mesh.polygons))
+    bpy.data.meshes.remove(mesh)
+    return result
+
+for size in GRID_SIZES:
+    primitives = [SyntheticPrimitive(size, i * size) for i in range(PRIMITIVES)]
+    legacy_time, legacy_verts, legacy_faces = bench(create_from_pydata, primitives)
+    bulk_time, bulk_verts, bulk_faces = bench(create_bulk, primitives)
+
+    assert (legacy_verts, legacy_faces) == (bulk_verts, bulk_faces)
+
+    print("%d verts / %d tris : from_pydata %.3fs, bulk %.3fs (x%.1f)" % (bulk_verts, bulk_faces, legacy_time, bulk_time, legacy_time / bulk_time))
@@ -0,0 +1,46 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+# Parse time of glTF files without Blender, serial and with all cores
+# Usage: python benchmarks/parse_bench.py file.glb [file.gltf ...]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from io_scene_gltf2_importer.parse import parse_gltf
+
+def bench(filename, threads):
+    start = time.perf_counter()
+    ir, error = parse_gltf(filename, {'decode_threads': threads})
+    elapsed = time.perf_counter() - start
+    if ir is None:
+        raise RuntimeError(filename + ": " + error)
+    size = sum([data.nbytes for data in ir.accessors.values()])
+    return elapsed, len(ir.accessors), size
+
+for filename in sys.argv[1:]:
+    serial_time, accessors, size = bench(filename, 1)
+    parallel_time, accessors, size = bench(filename, 0)
+
+    print("%s: %d accessors, %.1f MB decoded : serial %.3fs, %d threads %.3fs (x%.1f)" % (os.path.basename(filename), accessors, size / (1024 * 1024), serial_time, os.cpu_count() or 1, parallel_time, serial_time / parallel_time))
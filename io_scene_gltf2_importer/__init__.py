@@ -20,12 +20,13 @@
  * ***** END GPL LICENSE BLOCK *****
  """
 
-import bpy
-from bpy_extras.io_utils import ImportHelper
-from bpy.types import Operator
+try:
+    import bpy
+except ImportError:
+    bpy = None # Outside Blender: only bpy free packages (parse, buffer, conversion) can be used
 
-from .io import *
-from .scene import *
+if bpy is not None:
+    from .operators import *
 
 bl_info = {
     "name": "Blender glTF2 importer",
@@ -37,36 +38,14 @@ bl_info = {
     "category": "Import-Export"
 }
 
-#TODO reloading stuff
-
-class ImportglTF2(Operator, ImportHelper):
-    bl_idname = 'import_scene.gltf2'
-    bl_label  = "Import glTF2"
-
-    def execute(self, context):
-        return self.import_gltf2(context)
-
-    def import_gltf2(self, context):
-        bpy.context.scene.render.engine = 'CYCLES'
-        self.gltf = glTFImporter(self.filepath)
-        success, txt = self.gltf.read()
-        if not success:
-            self.report({'ERROR'}, txt)
-            return {'CANCELLED'}
-        self.gltf.blender_create()
-        self.gltf.debug_missing()
-
-        return {'FINISHED'}
-
-def menu_func_import(self, context):
-    self.layout.operator(ImportglTF2.bl_idname, text=ImportglTF2.bl_label)
-
 def register():
     bpy.utils.register_class(ImportglTF2)
+    bpy.utils.register_class(ClearglTF2Cache)
     bpy.types.INFO_MT_file_import.append(menu_func_import)
 
 def unregister():
     bpy.utils.unregister_class(ImportglTF2)
+    bpy.utils.unregister_class(ClearglTF2Cache)
     bpy.types.INFO_MT_file_import.remove(menu_func_import)
 
 if __name__ == "__main__":
@@ -21,3 +21,4 @@
  """
 
 from .animation import *
+from .fcurve import *
@@ -37,6 +37,11 @@ class Animation():
 
         channel_idx = 0
         for channel in self.json['channels']:
+            # Channels of nodes excluded by import plan are not decoded
+            if not self.gltf.is_channel_imported(channel):
+                channel_idx += 1
+                continue
+
             chan = AnimChannel(channel_idx, self.json['channels'][channel_idx], self, self.gltf)
             chan.read()
             chan.debug_missing()
@@ -46,7 +51,7 @@ class Animation():
         self.dispatch_to_nodes()
 
         if 'name' in self.json.keys():
-            self.name = self.json.keys()
+            self.name = self.json['name']
 
     def dispatch_to_nodes(self):
         for channel in self.channels:
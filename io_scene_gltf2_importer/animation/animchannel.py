@@ -20,7 +20,7 @@
  * ***** END GPL LICENSE BLOCK *****
  """
 
-from .sampler import *
+from ..parse import *
 
 class AnimChannel():
     def __init__(self, index, json, anim, gltf):
@@ -44,10 +44,26 @@ class AnimChannel():
                 if len(prim.targets) > channels:
                     channels = len(prim.targets)
         self.sampler = Sampler(self.json['sampler'], self.anim.json['samplers'][self.json['sampler']], self.gltf, channels)
-        self.data = self.sampler.read()
+        self.times, self.values = self.sampler.read()
+        self.in_tangents  = self.sampler.in_tangents # CUBICSPLINE only
+        self.out_tangents = self.sampler.out_tangents
         self.sampler.debug_missing()
         self.interpolation = self.sampler.interpolation
 
+        if self.gltf.import_settings['anim_simplify_tolerance'] > 0.0:
+            self.simplify(self.gltf.import_settings['anim_simplify_tolerance'])
+
+    def simplify(self, tolerance):
+        # Drop keys that linear (or constant) interpolation of their neighbours rebuilds within tolerance
+        times, values = simplify_channel(self.times, self.values, self.interpolation, tolerance, self.path == "rotation")
+
+        removed = len(self.times) - len(times)
+        if removed > 0:
+            print("Animation channel " + str(self.index) + ": " + str(removed) + " keys removed out of " + str(len(self.times)))
+            self.gltf.anim_removed_keys += removed
+
+        self.times  = times
+        self.values = values
 
     def debug_missing(self):
         keys = [
@@ -0,0 +1,127 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import bpy
+import numpy as np
+
+# glTF interpolation => Blender keyframe interpolation
+INTERPOLATIONS = {
+    'LINEAR': 'LINEAR',
+    'STEP': 'CONSTANT',
+    'CATMULLROMSPLINE': 'BEZIER', #TODO
+    'CUBICSPLINE': 'BEZIER'
+}
+
+def get_action(id_data, name):
+    # Action of a datablock (object, shape keys), created if needed
+    if id_data.animation_data is None:
+        id_data.animation_data_create()
+
+    if id_data.animation_data.action is None:
+        if not name:
+            name = id_data.name + "Action"
+        id_data.animation_data.action = bpy.data.actions.new(name)
+
+    return id_data.animation_data.action
+
+def get_bezier_handles(frames, values, tangents):
+    # Cubic spline tangents (per frame) => Bezier handles, a third of the key spacing away from each key
+    in_tangents, out_tangents = tangents
+
+    if len(frames) > 1:
+        spacing = np.diff(frames)
+        spacing_left  = np.concatenate(([spacing[0]], spacing)) / 3.0
+        spacing_right = np.concatenate((spacing, [spacing[-1]])) / 3.0
+    else:
+        spacing_left  = np.zeros(len(frames), dtype=np.float32)
+        spacing_right = np.zeros(len(frames), dtype=np.float32)
+
+    handles_left  = np.empty((len(frames), 2), dtype=np.float32)
+    handles_right = np.empty((len(frames), 2), dtype=np.float32)
+    handles_left[:, 0]  = frames - spacing_left
+    handles_left[:, 1]  = values - in_tangents * spacing_left
+    handles_right[:, 0] = frames + spacing_right
+    handles_right[:, 1] = values + out_tangents * spacing_right
+
+    return handles_left, handles_right
+
+def set_fcurves(action, data_path, frames, values, interpolation, group, tangents=None):
+    # One fcurve per value component, all keyframes written at once
+    # tangents: (in, out) tangents per frame for CUBICSPLINE, same shape as values
+    if interpolation in INTERPOLATIONS.keys():
+        blender_interpolation = INTERPOLATIONS[interpolation]
+    else:
+        print("Unknown interpolation : " + interpolation)
+        blender_interpolation = 'BEZIER'
+    ipo = bpy.types.Keyframe.bl_rna.properties['interpolation'].enum_items[blender_interpolation].value
+
+    # Handles from tangents are kept as is, others are computed by Blender
+    if tangents is not None:
+        handle_type = bpy.types.Keyframe.bl_rna.properties['handle_left_type'].enum_items['FREE'].value
+    else:
+        handle_type = bpy.types.Keyframe.bl_rna.properties['handle_left_type'].enum_items['AUTO_CLAMPED'].value
+
+    fcurves = []
+    for index in range(values.shape[1]):
+        co = np.empty((len(frames), 2), dtype=np.float32)
+        co[:, 0] = frames
+        co[:, 1] = values[:, index]
+        ipos = np.full(len(frames), ipo, dtype=np.int32)
+        handle_types_left  = np.full(len(frames), handle_type, dtype=np.int32)
+        handle_types_right = handle_types_left
+
+        if tangents is not None:
+            handles_left, handles_right = get_bezier_handles(frames, values[:, index], (tangents[0][:, index], tangents[1][:, index]))
+        else:
+            handles_left, handles_right = co, co
+
+        fcurve = action.fcurves.find(data_path, index)
+        if fcurve is None:
+            fcurve = action.fcurves.new(data_path, index, group)
+        else:
+            # Already animated by another animation: keep existing keyframes
+            nb_existing = len(fcurve.keyframe_points)
+            existing = {}
+            for attr, size, dtype in [('co', 2, np.float32), ('handle_left', 2, np.float32), ('handle_right', 2, np.float32),
+                                      ('interpolation', 1, np.int32), ('handle_left_type', 1, np.int32), ('handle_right_type', 1, np.int32)]:
+                existing[attr] = np.empty(size * nb_existing, dtype=dtype)
+                fcurve.keyframe_points.foreach_get(attr, existing[attr])
+
+            co            = np.concatenate((existing['co'].reshape(-1, 2), co))
+            handles_left  = np.concatenate((existing['handle_left'].reshape(-1, 2), handles_left))
+            handles_right = np.concatenate((existing['handle_right'].reshape(-1, 2), handles_right))
+            ipos          = np.concatenate((existing['interpolation'], ipos))
+            handle_types_left  = np.concatenate((existing['handle_left_type'], handle_types_left))
+            handle_types_right = np.concatenate((existing['handle_right_type'], handle_types_right))
+
+        fcurve.keyframe_points.add(len(frames))
+        fcurve.keyframe_points.foreach_set('co', co.ravel())
+        fcurve.keyframe_points.foreach_set('interpolation', ipos)
+        fcurve.keyframe_points.foreach_set('handle_left_type', handle_types_left)
+        fcurve.keyframe_points.foreach_set('handle_right_type', handle_types_right)
+        fcurve.keyframe_points.foreach_set('handle_left', handles_left.ravel())
+        fcurve.keyframe_points.foreach_set('handle_right', handles_right.ravel())
+        fcurve.update() # sort keyframes, compute auto handles
+
+        fcurves.append(fcurve)
+
+    return fcurves
@@ -0,0 +1,240 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+# Batch conversion of glTF files to .blend, fanned out over several Blender processes
+# Usage: blender --background --factory-startup --python batch.py -- INPUT [INPUT ...] --output DIR [--jobs N] [--timeout S] [--retries R]
+# INPUT is a directory (searched recursively for .gltf / .glb), a single file,
+# or a manifest: .json list of paths, or text file with one path per line
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import subprocess
+from collections import Counter, OrderedDict
+
+def get_arguments():
+    # Blender arguments are before '--'
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Convert glTF files to .blend with several Blender processes")
+    parser.add_argument('inputs', nargs='*', help="Directories, .gltf / .glb files or manifests")
+    parser.add_argument('--output', required=True, help="Directory of .blend files and summary")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="Number of Blender worker processes")
+    parser.add_argument('--timeout', type=float, default=600.0, help="Seconds allowed for one file")
+    parser.add_argument('--retries', type=int, default=1, help="Retries of a failed or timed out file")
+    parser.add_argument('--decode-threads', type=int, default=1, help="Decode threads in each worker")
+    parser.add_argument('--cache-dir', default=None, help="Persistent import cache shared by workers")
+    parser.add_argument('--summary', default=None, help="Summary json path, default in output directory")
+    parser.add_argument('--blender', default=None, help="Blender executable, default the one running this script")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--result', default=None, help=argparse.SUPPRESS)
+
+    return parser.parse_args(argv)
+
+def collect_files(inputs):
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                for name in sorted(names):
+                    if os.path.splitext(name)[1].lower() in ['.gltf', '.glb']:
+                        files.append(os.path.join(root, name))
+        elif os.path.splitext(path)[1].lower() in ['.gltf', '.glb']:
+            files.append(path)
+        elif os.path.splitext(path)[1].lower() == '.json':
+            with open(path, 'r') as f:
+                base = os.path.dirname(path)
+                files.extend([os.path.join(base, item) for item in json.load(f)])
+        else:
+            with open(path, 'r') as f:
+                base = os.path.dirname(path)
+                files.extend([os.path.join(base, line.strip()) for line in f if line.strip() != ''])
+
+    # Same file listed by several inputs is converted once, first occurrence keeps its place
+    return list(OrderedDict.fromkeys([os.path.abspath(file) for file in files]))
+
+def get_output_paths(output, files):
+    # Same base name in several directories: keep them apart
+    names = [os.path.splitext(os.path.basename(file))[0] for file in files]
+    counts = Counter(names)
+    output = os.path.abspath(output)
+
+    paths = {}
+    for idx, (file, name) in enumerate(zip(files, names)):
+        if counts[name] > 1:
+            name = name + "_" + str(idx)
+        paths[file] = os.path.join(output, name + ".blend")
+
+    return paths
+
+def run_worker(args):
+    # Inside a Blender process: import one file, save it, write timings into result json
+    import bpy
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from io_scene_gltf2_importer.io import glTFImporter
+
+    filename, output = args.inputs
+    result = {'file': filename, 'output': output}
+
+    # Empty file, without default scene objects
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+
+    start = time.perf_counter()
+    bpy.context.scene.render.engine = 'CYCLES'
+    import_settings = {
+        'decode_threads': args.decode_threads,
+        'cache_dir': args.cache_dir
+    }
+    gltf = glTFImporter(filename, import_settings)
+    success, txt = gltf.read()
+    result['read'] = time.perf_counter() - start
+
+    if success:
+        start = time.perf_counter()
+        gltf.blender_create()
+        result['create'] = time.perf_counter() - start
+    gltf.close()
+
+    if success:
+        start = time.perf_counter()
+        bpy.ops.wm.save_as_mainfile(filepath=output)
+        result['save'] = time.perf_counter() - start
+    else:
+        result['error'] = txt
+
+    with open(args.result, 'w') as f:
+        json.dump(result, f)
+
+    sys.exit(0 if success else 1)
+
+def run_job(args, blender, filename, output):
+    # One attempt on one file, in a new Blender process
+    result_path = output + ".result.json"
+    if os.path.exists(result_path):
+        os.remove(result_path)
+
+    # Python errors make Blender exit with an error code, instead of carrying on
+    command = [blender, '--background', '--factory-startup', '--python-exit-code', '1', '--python', os.path.abspath(__file__), '--',
+               filename, output, '--output', args.output, '--worker', '--result', result_path,
+               '--decode-threads', str(args.decode_threads)]
+    if args.cache_dir:
+        command.extend(['--cache-dir', args.cache_dir])
+
+    job = {'file': filename, 'output': output}
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=args.timeout)
+        job['returncode'] = process.returncode
+        log = process.stdout
+    except subprocess.TimeoutExpired as e:
+        job['error'] = "Timeout after " + str(args.timeout) + "s"
+        log = e.stdout
+    job['time'] = time.perf_counter() - start
+
+    if os.path.exists(result_path):
+        with open(result_path, 'r') as f:
+            job.update(json.load(f))
+        os.remove(result_path)
+    elif 'error' not in job.keys():
+        job['error'] = "Blender exited with code " + str(job['returncode'])
+
+    job['success'] = 'error' not in job.keys() and job['returncode'] == 0
+    if not job['success'] and log:
+        job['log'] = log.decode('utf-8', 'replace')[-2000:] # Last lines are enough to see what failed
+
+    return job
+
+def run_coordinator(args):
+    blender = args.blender
+    if blender is None:
+        import bpy
+        blender = bpy.app.binary_path
+
+    files = collect_files(args.inputs)
+    outputs = get_output_paths(args.output, files)
+    os.makedirs(args.output, exist_ok=True)
+
+    jobs = queue.Queue()
+    for filename in files:
+        jobs.put((filename, 0))
+
+    results = {}
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            try:
+                filename, attempt = jobs.get_nowait()
+            except queue.Empty:
+                return
+
+            job = run_job(args, blender, filename, outputs[filename])
+            job['attempts'] = attempt + 1
+
+            with lock:
+                results[filename] = job
+                if job['success']:
+                    status = "OK"
+                elif attempt < args.retries:
+                    status = "FAILED, retrying"
+                    jobs.put((filename, attempt + 1))
+                else:
+                    status = "FAILED"
+                print("[" + str(len([job for job in results.values() if job['success']])) + "/" + str(len(files)) + "] " + filename + ": " + status + " in " + str(round(job['time'], 2)) + "s")
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for i in range(max(1, min(args.jobs, len(files))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = {
+        'files': len(files),
+        'succeeded': len([job for job in results.values() if job['success']]),
+        'failed': len([job for job in results.values() if not job['success']]),
+        'jobs': args.jobs,
+        'time': time.perf_counter() - start,
+        'results': [results[filename] for filename in files]
+    }
+
+    summary_path = args.summary if args.summary else os.path.join(args.output, "summary.json")
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print("Batch import: " + str(summary['succeeded']) + " succeeded, " + str(summary['failed']) + " failed in " + str(round(summary['time'], 2)) + "s, summary in " + summary_path)
+
+    return summary['failed'] == 0
+
+if __name__ == "__main__":
+    args = get_arguments()
+    if args.worker:
+        run_worker(args)
+    else:
+        sys.exit(0 if run_coordinator(args) else 1)
@@ -20,4 +20,7 @@
  * ***** END GPL LICENSE BLOCK *****
  """
 
+from .datauri import *
+from .manager import *
 from .accessor import *
+from .prefetch import *
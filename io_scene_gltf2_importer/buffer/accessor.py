@@ -20,35 +20,41 @@
  * ***** END GPL LICENSE BLOCK *****
  """
 
-import struct
+import numpy as np
 from .bufferview import *
 from .sparse import *
+from .cache import *
 
 
 class Accessor():
     def __init__(self, index, json, gltf):
+        self.index = index
         self.json  = json   # Accessor json
         self.gltf =  gltf # Reference to global glTF instance
         self.name = None
 
     def read(self):
-        if not 'bufferView' in self.json:
-            return
-
         if 'name' in self.json.keys():
             self.name = self.json['name']
 
-        self.bufferView = BufferView(self.json['bufferView'], self.gltf.json['bufferViews'][self.json['bufferView']], self.gltf)
-        self.bufferView.read()
-        self.bufferView.debug_missing()
+        # Each accessor is decoded only once per import
+        data = self.gltf.accessor_cache.get(self.index)
+        if data is not None:
+            self.data = data
+            return self.data
 
-        fmt_char = self.gltf.fmt_char_dict[self.json['componentType']]
-        component_size = struct.calcsize(fmt_char)
+        # Decoded by a previous import of same file
+        data = self.gltf.read_cached_accessor(self.index)
+        if data is not None:
+            self.data = data
+        else:
+            self.decode()
+        self.gltf.accessor_cache.set(self.index, self.data)
 
-        component_nb = self.gltf.component_nb_dict[self.json['type']]
-        fmt = '<' + (fmt_char * component_nb)
+        return self.data
 
-        stride = struct.calcsize(fmt)
+    def decode(self):
+        # Decoding only, without cache access: can be run from prefetch worker threads
 
         # TODO data alignment stuff
 
@@ -57,22 +63,48 @@ class Accessor():
         else:
             offset = 0
 
+        if 'bufferView' in self.json.keys():
+            self.bufferView = BufferView(self.json['bufferView'], self.gltf.json['bufferViews'][self.json['bufferView']], self.gltf)
+            self.bufferView.read()
+            self.bufferView.debug_missing()
+
+            self.data = self.bufferView.read_array(self.json['componentType'], self.json['type'], self.json['count'], offset)
+        else:
+            # No bufferView: accessor is initialized with zeros (sparse accessors)
+            dtype = np.dtype('<' + self.gltf.fmt_char_dict[self.json['componentType']])
+            component_nb = self.gltf.component_nb_dict[self.json['type']]
+            self.data = np.zeros((self.json['count'], component_nb), dtype=dtype)
+
         if 'sparse' in self.json.keys():
             self.sparse = Sparse(self.json['componentType'], self.json['type'], self.json['sparse'], self.gltf)
             self.sparse.read()
             self.sparse.debug_missing()
-            self.data = self.bufferView.read_data(fmt, stride, self.json['count'], offset)
             self.apply_sparse()
-            return self.data
 
-        else:
-            return self.bufferView.read_data(fmt, stride, self.json['count'], offset)
+        return self.data
+
+    def is_sparse_only(self):
+        return 'sparse' in self.json.keys() and 'bufferView' not in self.json.keys()
+
+    def read_sparse(self):
+        # Sparse indices and values, without applying them on a zero initialized array
+        if 'name' in self.json.keys():
+            self.name = self.json['name']
+
+        self.sparse = Sparse(self.json['componentType'], self.json['type'], self.json['sparse'], self.gltf)
+        self.sparse.read()
+        self.sparse.debug_missing()
+
+        return self.sparse.indices, self.sparse.data
+
+    def read_tuples(self):
+        # Compatibility shim: list of tuples, as returned before numpy decoding
+        return [tuple(element) for element in self.read().tolist()]
 
     def apply_sparse(self):
-        cpt_idx = 0
-        for idx in self.sparse.indices:
-            self.data[idx[0]] = self.sparse.data[cpt_idx]
-            cpt_idx += 1
+        # Buffer views are read only, work on a copy
+        self.data = np.array(self.data)
+        self.data[self.sparse.indices] = self.sparse.data
 
     def debug_missing(self):
         keys = [
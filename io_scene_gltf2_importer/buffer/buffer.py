@@ -20,8 +20,9 @@
  * ***** END GPL LICENSE BLOCK *****
  """
 
-import base64
+import mmap
 from os.path import dirname, join
+from .datauri import *
 
 class Buffer():
     def __init__(self, index, json, gltf):
@@ -29,25 +30,50 @@ class Buffer():
         self.json  = json  # buffer json
         self.gltf = gltf # Reference to global glTF instance
 
+        self.data = None
+        self.data_map = None
+
     def read(self):
 
-        if self.gltf.is_glb_format:
-            return
+        if self.data is not None:
+            return # glb BIN chunk
 
         self.length = self.json['byteLength']
 
         if 'uri' in self.json.keys():
-            sep = ';base64,'
-            if self.json['uri'][:5] == 'data:':
-                idx = self.json['uri'].find(sep)
-                if idx != -1:
-                    data = self.json['uri'][idx+len(sep):]
-                    self.data = base64.b64decode(data)
-                    return
+            if is_data_uri(self.json['uri']):
+                if is_released_data_uri(self.json['uri']):
+                    # Json from import cache: payload is stored with it, or has to be read again from file
+                    path = self.gltf.get_cached_payload_path('buffers', self.index)
+                    if path is not None:
+                        self.load_file(path)
+                        return
+                    self.json['uri'] = self.gltf.get_original_json()['buffers'][self.index]['uri']
+                self.data = memoryview(decode_data_uri(self.json['uri'], "buffer " + str(self.index)))
+                release_data_uri(self.json)
+                return
+
+            self.load_file(join(dirname(self.gltf.filename), self.json['uri']))
+
+    def load_file(self, filename):
+        with open(filename, 'rb') as f_:
+            f_.seek(0, 2)
+            if f_.tell() == 0:
+                self.data = b''
+                return
 
+            # Map file instead of reading it, views are then sliced without copy
+            self.data_map = mmap.mmap(f_.fileno(), 0, access=mmap.ACCESS_READ)
+            self.data = memoryview(self.data_map)
 
-            with open(join(dirname(self.gltf.filename), self.json['uri']), 'rb') as f_:
-                self.data = f_.read()
+    def close(self):
+        self.data = None
+        if self.data_map is not None:
+            try:
+                self.data_map.close()
+            except BufferError:
+                pass # Still referenced by decoded data, released with it
+            self.data_map = None
 
     def debug_missing(self):
         keys = [
@@ -20,8 +20,8 @@
  * ***** END GPL LICENSE BLOCK *****
  """
 
-import struct
-from .buffer import *
+import numpy as np
+from .manager import *
 
 class BufferView():
     def __init__(self, index, json, gltf):
@@ -33,37 +33,45 @@ class BufferView():
         if not 'buffer' in self.json.keys():
             return
 
-        if self.json['buffer'] not in self.gltf.buffers:
-            self.gltf.buffers[self.json['buffer']] = Buffer(self.json['buffer'], self.gltf.json['buffers'][self.json['buffer']], self.gltf)
-        self.buffer = self.gltf.buffers[self.json['buffer']]
-        self.buffer.read()
-        self.buffer.debug_missing()
+        self.buffer = self.gltf.buffers.get_bufferview(self.index, self.json)
 
-    def read_data(self, fmt, stride_, count, accessor_offset):
-        data = []
+    def read_array(self, component_type, type, count, accessor_offset):
+        dtype = np.dtype('<' + self.gltf.fmt_char_dict[component_type])
+        component_nb = self.gltf.component_nb_dict[type]
+
+        return self.read_typed_array(dtype, component_nb, count, accessor_offset)
+
+    def read_typed_array(self, dtype, component_nb, count, accessor_offset):
+        element_size = dtype.itemsize * component_nb
 
         if 'byteOffset' in self.json.keys():
             bufferview_offset = self.json['byteOffset']
         else:
             bufferview_offset = 0
 
-        length = self.json['byteLength']
-
         if 'byteStride' in self.json.keys():
             stride = self.json['byteStride']
         else:
-            stride = stride_
+            stride = element_size
+
+        offset = bufferview_offset + accessor_offset
 
-        slice = self.buffer.data[bufferview_offset:bufferview_offset + length]
+        if count == 0:
+            return np.zeros((0, component_nb), dtype=dtype)
 
+        if stride == element_size:
+            # Tightly packed data: a single typed view over the buffer
+            data = np.frombuffer(self.buffer.data, dtype=dtype, count=count * component_nb, offset=offset)
+            return data.reshape(count, component_nb)
 
-        offset = accessor_offset
-        while len(data) < count:
-            element = struct.unpack_from(fmt, slice , offset)
-            data.append(element)
-            offset += stride
+        # Interleaved data: strided view over the buffer, no copy
+        # (last element does not need to be padded up to stride)
+        return np.ndarray((count, component_nb), dtype=dtype, buffer=self.buffer.data, offset=offset, strides=(stride, dtype.itemsize))
 
-        return data
+    def read_data(self, fmt, stride_, count, accessor_offset):
+        # Compatibility shim: list of tuples, as returned before numpy decoding
+        data = self.read_typed_array(np.dtype('<' + fmt[1]), len(fmt) - 1, count, accessor_offset)
+        return [tuple(element) for element in data.tolist()]
 
     def read_binary_data(self):
         if 'byteOffset' in self.json.keys():
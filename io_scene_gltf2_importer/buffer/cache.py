@@ -0,0 +1,71 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+from collections import OrderedDict
+
+class AccessorCache():
+    def __init__(self, budget=0):
+        self.budget = budget # Max size in bytes of cached data, 0 means no limit
+        self.data = OrderedDict() # accessor index => decoded data, in LRU order
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def has(self, index):
+        return index in self.data.keys()
+
+    def get(self, index):
+        if index not in self.data.keys():
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.data.move_to_end(index)
+        return self.data[index]
+
+    def set(self, index, data):
+        # Data is shared by all consumers of this accessor
+        data.setflags(write=False)
+
+        if index in self.data.keys():
+            self.size -= self.data[index].nbytes
+        self.data[index] = data
+        self.data.move_to_end(index)
+        self.size += data.nbytes
+
+        if self.budget == 0:
+            return
+
+        # Evict least recently used data, but always keep the last one
+        while self.size > self.budget and len(self.data) > 1:
+            evicted_index, evicted = self.data.popitem(last=False)
+            self.size -= evicted.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        self.data.clear()
+        self.size = 0
+
+    def debug_stats(self):
+        print("Accessor cache: " + str(self.hits) + " hits, " + str(self.misses) + " misses, " + str(self.evictions) + " evictions, " + str(self.size) + " bytes")
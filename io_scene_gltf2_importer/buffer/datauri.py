@@ -0,0 +1,76 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import binascii
+import time
+
+CHUNK_SIZE = 4 * 1024 * 1024 # base64 characters decoded at once, multiple of 4
+
+def is_data_uri(uri):
+    return uri[:5] == 'data:' and uri.find(';base64,') != -1
+
+def is_released_data_uri(uri):
+    # Payload removed by release_data_uri
+    return uri.endswith(';base64,')
+
+def decode_data_uri(uri, name=""):
+    # Decode base64 payload chunk by chunk into a preallocated bytearray
+    # Only one chunk of the source string is copied at a time
+    start_time = time.perf_counter()
+
+    start = uri.find(';base64,') + len(';base64,')
+    end = len(uri)
+    while end > start and uri[end - 1] == '=':
+        end -= 1
+
+    data = bytearray((end - start) * 3 // 4)
+    offset = 0
+
+    pos = start
+    while pos < end:
+        chunk_end = min(pos + CHUNK_SIZE, end)
+        chunk = uri[pos:chunk_end]
+
+        # Last chunk: restore padding removed above
+        if chunk_end == end and len(chunk) % 4 != 0:
+            chunk += '=' * (4 - len(chunk) % 4)
+
+        decoded = binascii.a2b_base64(chunk)
+        data[offset:offset + len(decoded)] = decoded
+        offset += len(decoded)
+        pos = chunk_end
+
+    # Non base64 characters (whitespace) are skipped by decoder, output is then shorter
+    if offset != len(data):
+        del data[offset:]
+
+    duration = time.perf_counter() - start_time
+    throughput = len(data) / (1024 * 1024) / duration if duration > 0 else 0.0
+    chunk_len = min(CHUNK_SIZE, end - start)
+    estimated_peak = len(data) + chunk_len + chunk_len * 3 // 4 # output, plus one source chunk and its decoded copy, not measured
+    print("Data URI " + name + ": " + str(len(data)) + " bytes decoded at " + str(round(throughput, 1)) + " MB/s, estimated peak " + str(estimated_peak // 1024) + " KB")
+
+    return data
+
+def release_data_uri(json):
+    # Keep only uri header, payload is no longer needed once decoded
+    json['uri'] = json['uri'][:json['uri'].find(';base64,') + len(';base64,')]
@@ -0,0 +1,66 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+from .buffer import *
+
+class BufferManager():
+    def __init__(self, gltf):
+        self.gltf = gltf # Reference to global glTF instance
+        self.buffers = {} # buffer index => Buffer, only for buffers already accessed
+        self.glb_chunks = {} # buffer index => (offset, length) of BIN chunk in glb file
+        self.bufferviews = {} # bufferView index => bytes length, for bufferViews already accessed
+
+    def get(self, index):
+        # Buffer is created and loaded (file mapped, data uri decoded) on first access only
+        if index not in self.buffers.keys():
+            buffer = Buffer(index, self.gltf.json['buffers'][index], self.gltf)
+            if index in self.glb_chunks.keys():
+                if self.gltf.content is None:
+                    self.gltf.map_content() # Json came from import cache
+                offset, length = self.glb_chunks[index]
+                buffer.data = self.gltf.content[offset:offset + length]
+            buffer.read()
+            buffer.debug_missing()
+            self.buffers[index] = buffer
+
+        return self.buffers[index]
+
+    def get_bufferview(self, index, json):
+        if index not in self.bufferviews.keys():
+            self.bufferviews[index] = json['byteLength']
+
+        return self.get(json['buffer'])
+
+    def close(self):
+        for buffer in self.buffers.values():
+            buffer.close()
+
+    def debug_stats(self):
+        total = 0
+        if 'buffers' in self.gltf.json.keys():
+            total = sum([buffer['byteLength'] for buffer in self.gltf.json['buffers']])
+            buffer_nb = len(self.gltf.json['buffers'])
+        else:
+            buffer_nb = 0
+
+        read = sum(self.bufferviews.values())
+        print("Buffers: " + str(len(self.buffers)) + "/" + str(buffer_nb) + " loaded, " + str(read) + " bytes of bufferViews read out of " + str(total) + " bytes")
@@ -0,0 +1,144 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .accessor import *
+
+def get_accessor_indices(gltf):
+    # All accessors read as full arrays while parsing imported meshes, skins and animations
+    indices = set()
+
+    for mesh_idx in gltf.get_imported_meshes():
+        for prim in gltf.json['meshes'][mesh_idx]['primitives']:
+            indices.update(prim['attributes'].values())
+            if 'indices' in prim.keys():
+                indices.add(prim['indices'])
+            if 'targets' in prim.keys():
+                for target in prim['targets']:
+                    indices.update(target.values())
+
+    for skin_idx in gltf.get_imported_skins():
+        if 'inverseBindMatrices' in gltf.json['skins'][skin_idx].keys():
+            indices.add(gltf.json['skins'][skin_idx]['inverseBindMatrices'])
+
+    if 'animations' in gltf.json.keys():
+        for anim_idx in gltf.plan.get_animations(gltf.json):
+            anim = gltf.json['animations'][anim_idx]
+            for channel in anim['channels']:
+                if gltf.is_channel_imported(channel):
+                    indices.add(anim['samplers'][channel['sampler']]['input'])
+                    indices.add(anim['samplers'][channel['sampler']]['output'])
+
+    # Sparse only accessors are read as (indices, values), never as full arrays
+    return [index for index in sorted(indices) if 'bufferView' in gltf.json['accessors'][index].keys() or 'sparse' not in gltf.json['accessors'][index].keys()]
+
+def collect_accessors(gltf):
+    selected = []
+    size = 0
+    budget = gltf.accessor_cache.budget
+    for index in get_accessor_indices(gltf):
+        accessor = gltf.json['accessors'][index]
+
+        # Do not prefetch more than the cache can keep, evicted data would be decoded twice
+        if budget != 0:
+            size += accessor['count'] * gltf.component_nb_dict[accessor['type']] * np.dtype(gltf.fmt_char_dict[accessor['componentType']]).itemsize
+            if size > budget:
+                break
+
+        selected.append(index)
+
+    return selected
+
+def load_accessor_buffers(gltf, indices):
+    # Buffers are loaded (and registered in gltf.buffers) before any worker starts
+    bufferviews = set()
+    for index in indices:
+        accessor = gltf.json['accessors'][index]
+        if 'bufferView' in accessor.keys():
+            bufferviews.add(accessor['bufferView'])
+        if 'sparse' in accessor.keys():
+            bufferviews.add(accessor['sparse']['indices']['bufferView'])
+            bufferviews.add(accessor['sparse']['values']['bufferView'])
+
+    for bufferview_idx in sorted(bufferviews):
+        bufferview = BufferView(bufferview_idx, gltf.json['bufferViews'][bufferview_idx], gltf)
+        bufferview.read()
+
+def decode_accessor(gltf, index):
+    accessor = Accessor(index, gltf.json['accessors'][index], gltf)
+    data = accessor.decode()
+
+    # Sparse and zero initialized accessors are already decoded in memory
+    if data.flags['OWNDATA']:
+        return data
+
+    # Decoding only creates views: materialize them here, so that file reads (page faults of mapped
+    # buffers) and gathers of interleaved data are paid by the workers, in parallel, and not later while parsing
+    buffer = accessor.bufferView.buffer
+    mapped = buffer.data_map is not None or buffer.index in gltf.buffers.glb_chunks.keys()
+    if mapped or not data.flags['C_CONTIGUOUS']:
+        return np.array(data)
+
+    # Tightly packed view over a decoded data uri buffer: already in memory, keep the view
+    return data
+
+def prefetch_accessors(gltf, threads=0):
+    # Decode all needed accessors up front, so that parsing only hits the cache
+    # threads: 0 uses all cores, 1 decodes serially on the calling thread
+    start = time.perf_counter()
+
+    indices = collect_accessors(gltf)
+
+    # Already decoded (parsed ahead), or decoded by a previous import of same file and only mapped
+    indices = [index for index in indices if not gltf.accessor_cache.has(index)]
+    cached = 0
+    for index in list(indices):
+        data = gltf.read_cached_accessor(index)
+        if data is not None:
+            gltf.accessor_cache.set(index, data)
+            indices.remove(index)
+            cached += 1
+    if cached > 0:
+        print("Accessor prefetch: " + str(cached) + " accessors already decoded (parsed ahead or import cache)")
+
+    if len(indices) == 0:
+        return
+
+    load_accessor_buffers(gltf, indices)
+
+    if threads == 0:
+        threads = os.cpu_count() or 1
+    threads = min(threads, len(indices))
+
+    if threads == 1:
+        results = [decode_accessor(gltf, index) for index in indices]
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(lambda index: decode_accessor(gltf, index), indices))
+
+    # Cache is only written from the calling thread, in accessor order
+    for index, data in zip(indices, results):
+        gltf.accessor_cache.set(index, data)
+
+    print("Accessor prefetch: " + str(len(indices)) + " accessors decoded with " + str(threads) + " threads in " + str(round(time.perf_counter() - start, 3)) + "s")
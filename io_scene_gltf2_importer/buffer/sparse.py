@@ -20,7 +20,6 @@
  * ***** END GPL LICENSE BLOCK *****
  """
 
-import struct
 from .bufferview import *
 
 class Sparse():
@@ -39,15 +38,6 @@ class Sparse():
             self.indices_buffer.read()
             self.indices_buffer.debug_missing()
 
-            #TODO factorisation with accessor code ?
-            fmt_char = self.gltf.fmt_char_dict[self.json['indices']['componentType']]
-            component_size = struct.calcsize(fmt_char)
-
-            component_nb = self.gltf.component_nb_dict['SCALAR']
-            fmt = '<' + (fmt_char * component_nb)
-
-            stride = struct.calcsize(fmt)
-
             # TODO data alignment stuff
 
             if 'byteOffset' in self.json['indices'].keys():
@@ -55,7 +45,7 @@ class Sparse():
             else:
                 offset = 0
 
-            self.indices = self.indices_buffer.read_data(fmt, stride, self.count, offset)
+            self.indices = self.indices_buffer.read_array(self.json['indices']['componentType'], 'SCALAR', self.count, offset)[:, 0]
 
 
         if 'values' in self.json.keys():
@@ -64,15 +54,6 @@ class Sparse():
             self.bufferView.read()
             self.bufferView.debug_missing()
 
-            #TODO factorisation with accessor code ?
-            fmt_char = self.gltf.fmt_char_dict[self.component_type]
-            component_size = struct.calcsize(fmt_char)
-
-            component_nb = self.gltf.component_nb_dict[self.type]
-            fmt = '<' + (fmt_char * component_nb)
-
-            stride = struct.calcsize(fmt)
-
             # TODO data alignment stuff
 
             if 'byteOffset' in self.json['values'].keys():
@@ -80,7 +61,7 @@ class Sparse():
             else:
                 offset = 0
 
-            self.data = self.bufferView.read_data(fmt, stride, self.count, offset)
+            self.data = self.bufferView.read_array(self.component_type, self.type, self.count, offset)
 
     def debug_missing(self):
         keys = [
@@ -0,0 +1,74 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import numpy as np
+
+# Array versions of Node.convert_* methods, for bulk data (Y-up => Z-up)
+
+def convert_locations(locations):
+    locations = np.asarray(locations, dtype=np.float32)
+    return np.stack((locations[:, 0], -locations[:, 2], locations[:, 1]), axis=1)
+
+def dequantize(data):
+    # Normalized integer data (colors, texcoords, weights) to float
+    if data.dtype.kind == 'f':
+        return data
+
+    values = data.astype(np.float32) / np.iinfo(data.dtype).max
+    if data.dtype.kind == 'i':
+        values = np.maximum(values, -1.0)
+
+    return values
+
+def convert_quaternions(quaternions):
+    # glTF xyzw => Blender wxyz, Y-up => Z-up
+    quaternions = np.asarray(quaternions, dtype=np.float32)
+    return np.stack((quaternions[:, 3], quaternions[:, 0], -quaternions[:, 2], quaternions[:, 1]), axis=1)
+
+def convert_scales(scales):
+    return np.asarray(scales, dtype=np.float32) # TODO test scale animation
+
+def quaternion_multiply(a, b):
+    # Hamilton product of wxyz quaternion arrays, broadcasting like numpy operators
+    aw, ax, ay, az = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    bw, bx, by, bz = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+    return np.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw
+        ), axis=-1)
+
+def quaternions_continuity_signs(quaternions):
+    # q and -q are the same rotation: sign of each key so that it stays in the hemisphere of the previous one,
+    # and interpolation between keys takes the shortest path
+    signs = np.ones((len(quaternions), 1), dtype=np.float32)
+    if len(quaternions) < 2:
+        return signs
+
+    dots = np.sum(quaternions[1:] * quaternions[:-1], axis=1)
+    flips = np.cumsum(dots < 0) % 2 == 1
+    signs[1:][flips] = -1.0
+    return signs
+
+def make_quaternions_continuous(quaternions):
+    return quaternions * quaternions_continuity_signs(quaternions)
@@ -20,8 +20,7 @@
  * ***** END GPL LICENSE BLOCK *****
  """
 
-import json
-
+from ..parse import *
 from ..scene import *
 from ..animation import *
 
@@ -36,144 +35,65 @@ class BlenderData():
         self.scene = scene_name
 
 
-class glTFImporter():
-
-
+class glTFImporter(glTFLoader):
+    # Blender side: file is loaded (or taken from a parsed GltfIR) by glTFLoader
 
-
-    def __init__(self, filename):
-        self.filename = filename
+    def __init__(self, filename, import_settings=None, ir=None):
+        glTFLoader.__init__(self, filename, import_settings, ir)
         self.other_scenes = []
 
-
-        self.buffers = {}
-        self.materials = {}
-        self.default_material = None
+        self.materials = {} # (material json hash, vertex color) => Material
+        self.material_hits = 0
         self.skins = {}
+        self.meshes = {} # (mesh index, skin index) => Mesh, shared by all nodes instancing it
+        self.mesh_instances = 0
         self.images = {}
-
-        self.load()
+        self.blender_images = {} # image content hash => Blender image name
+        self.image_hits = 0
+        self.anim_removed_keys = 0
 
         self.blender = BlenderData()
 
-        self.fmt_char_dict = {}
-        self.fmt_char_dict[5120] = 'b' # Byte
-        self.fmt_char_dict[5121] = 'B' # Unsigned Byte
-        self.fmt_char_dict[5122] = 'h' # Short
-        self.fmt_char_dict[5123] = 'H' # Unsigned Short
-        self.fmt_char_dict[5125] = 'I' # Unsigned Int
-        self.fmt_char_dict[5126] = 'f' # Float
-
-        self.component_nb_dict = {}
-        self.component_nb_dict['SCALAR'] = 1
-        self.component_nb_dict['VEC2']   = 2
-        self.component_nb_dict['VEC3']   = 3
-        self.component_nb_dict['VEC4']   = 4
-        self.component_nb_dict['MAT2']   = 4
-        self.component_nb_dict['MAT3']   = 9
-        self.component_nb_dict['MAT4']   = 16
-
-    def load_glb(self):
-        header = struct.unpack_from('<I4s', self.content)
-        self.version = header[1]
-
-        offset = 12 # header size = 12
-
-        # TODO check json type for chunk 0, and BIN type for next ones
-
-        # json
-        type, str_json, offset = self.load_chunk(offset)
-        self.json = json.loads(str_json.decode('utf-8'))
-
-        # binary data
-        chunk_cpt = 0
-        while offset < len(self.content):
-            type, data, offset = self.load_chunk(offset)
-
-            self.buffers[chunk_cpt] = Buffer(chunk_cpt, self.json['buffers'][chunk_cpt], self)
-            self.buffers[chunk_cpt].data = data #TODO .length
-            chunk_cpt += 1
-
-        self.content = None
-
-
-    def load_chunk(self, offset):
-        chunk_header = struct.unpack_from('<I4s', self.content, offset)
-        data_length  = chunk_header[0]
-        data_type    = chunk_header[1]
-        data         = self.content[offset + 8 : offset + 8 + data_length]
-
-        return data_type, data, offset + 8 + data_length
-
-    def load(self):
-        with open(self.filename, 'rb') as f:
-            self.content = f.read()
-
-
-        self.is_glb_format = self.content[:4] == b'glTF'
-
-        if not self.is_glb_format:
-            self.content = None
-            with open(self.filename, 'r') as f:
-                content = f.read()
-                self.json = json.loads(content)
-
-        else:
-            # Parsing glb file
-            self.load_glb()
-
-
-    def get_root_scene(self):
-        if 'scene' in self.json.keys():
-            return self.json['scene'], self.json['scenes'][self.json['scene']]
-        return 0, self.json['scenes'][0]
-
-    def check_version(self):
-        if not 'asset' in self.json.keys():
-            return False, "No asset data in json"
-
-        if not 'version' in self.json['asset']:
-            return False, "No version data in json asset"
-
-        if self.json['asset']['version'] != "2.0":
-            return False, "glTF version must be 2.0"
-
-        return True, None
-
-
     def read(self):
 
         check_version, txt = self.check_version()
         if not check_version:
             return False, txt
 
+        self.plan.resolve(self.json)
+
         idx, scene = self.get_root_scene()
-        if not scene:
+        if scene is None:
             return False, "Error reading root scene"
+
+        # Decode accessors concurrently, scene parsing then reads them from cache
+        prefetch_accessors(self, self.import_settings['decode_threads'])
+        load_images(self, self.import_settings['decode_threads'])
+
         self.scene = Scene(idx, scene, self)
         self.scene.read()
         self.scene.debug_missing()
 
-        # manage all scenes (except root scene that is already managed)
-        scene_idx = 0
-        for scene_it in self.json['scenes']:
+        # manage all selected scenes (except root scene that is already managed)
+        for scene_idx in self.plan.get_scenes(self.json):
             if scene_idx == idx:
                 continue
             scene = Scene(scene_idx, self.json['scenes'][scene_idx] , self)
             scene.read()
             scene.debug_missing()
-            scene_idx += 1
             self.other_scenes.append(scene)
 
 
-        # manage animations
+        # manage selected animations
         if 'animations' in self.json.keys():
-            anim_idx = 0
-            for anim in self.json['animations']:
+            for anim_idx in self.plan.get_animations(self.json):
                 animation = Animation(anim_idx, self.json['animations'][anim_idx], self)
                 animation.read()
                 animation.debug_missing()
 
+            if self.import_settings['anim_simplify_tolerance'] > 0.0:
+                print("Animation simplification: " + str(self.anim_removed_keys) + " keys removed")
+
         # Set bone type on all joints
         for node in self.scene.nodes.values():
             is_joint, skin = self.is_node_joint(node.index)
@@ -188,8 +108,26 @@ class glTFImporter():
                     node.is_joint = True
                     node.skin_id     = skin
 
+        self.accessor_cache.debug_stats()
+        self.buffers.debug_stats()
+        print("Meshes: " + str(len(self.meshes)) + " unique, " + str(self.mesh_instances) + " instances sharing them")
+        print("Materials: " + str(len(self.materials)) + " unique, " + str(self.material_hits) + " reused")
+
+        if self.disk_cache is not None:
+            self.disk_cache.store(self, self.cache_entry)
+            self.disk_cache.debug_stats()
+
         return True, None # Success
 
+    def get_data_uri_payloads(self):
+        # Decoded images are still in memory too: Blender images are created after import cache is stored
+        payloads = glTFLoader.get_data_uri_payloads(self)
+        for idx, image in self.images.items():
+            if image.data is not None and 'uri' in image.json.keys() and is_data_uri(image.json['uri']):
+                payloads.append(('images', idx, image.data))
+
+        return payloads
+
     def get_node(self, node_id):
         if node_id in self.scene.nodes.keys():
             return self.scene.nodes[node_id]
@@ -212,25 +150,4 @@ class glTFImporter():
         for scene in self.other_scenes:
             scene.blender_create()
 
-
-    def debug_missing(self):
-        keys = [
-                'scene',
-                'nodes',
-                'scenes',
-                'meshes',
-                'accessors',
-                'bufferViews',
-                'buffers',
-                'materials',
-                'animations',
-                'cameras',
-                'skins',
-                'textures',
-                'images',
-                'asset'
-                ]
-
-        for key in self.json.keys():
-            if key not in keys:
-                print("GLTF MISSING " + key)
+        print("Images: " + str(len(self.blender_images)) + " unique, " + str(self.image_hits) + " reused")
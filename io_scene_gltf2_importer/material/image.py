@@ -22,8 +22,10 @@
 
 import bpy
 import os
-import base64
 import tempfile
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from os.path import dirname, join
 from ..buffer import *
 
@@ -34,17 +36,28 @@ class Image():
         self.gltf  = gltf # Reference to global glTF instance
 
         self.blender_image_name = None
+        self.data = None
+        self.hash = None
 
     def read(self):
 
+        if self.data is not None:
+            return # Already loaded by load_images
+
         if 'uri' in self.json.keys():
-            sep = ';base64,'
-            if self.json['uri'][:5] == 'data:':
-                idx = self.json['uri'].find(sep)
-                if idx != -1:
-                    data = self.json['uri'][idx+len(sep):]
-                    self.data = base64.b64decode(data)
-                    return
+            if is_data_uri(self.json['uri']):
+                if is_released_data_uri(self.json['uri']):
+                    # Json from import cache: payload is stored with it, or has to be read again from file
+                    path = self.gltf.get_cached_payload_path('images', self.index)
+                    if path is not None:
+                        with open(path, 'rb') as f_:
+                            self.data = f_.read()
+                        return
+                    self.json['uri'] = self.gltf.get_original_json()['images'][self.index]['uri']
+                # Decoded bytearray is kept until the Blender image is created, converted to bytes only for packing
+                self.data = decode_data_uri(self.json['uri'], "image " + str(self.index))
+                release_data_uri(self.json)
+                return
 
             with open(join(dirname(self.gltf.filename), self.json['uri']), 'rb') as f_:
                 self.data = f_.read()
@@ -57,11 +70,60 @@ class Image():
         self.bufferView.read()
         self.bufferView.debug_missing()
 
-        self.data = self.bufferView.read_binary_data()
+        # Packing needs its own bytes, not a view over the mapped file
+        self.data = bytes(self.bufferView.read_binary_data())
 
         return
 
+    def get_hash(self):
+        # Same bytes under several uris, bufferViews or data uris are one image
+        if self.hash is None and self.data is not None:
+            self.hash = hashlib.blake2b(self.data, digest_size=16).hexdigest()
+        return self.hash
+
     def blender_create(self):
+        # Image can be shared by several textures
+        if self.blender_image_name is not None:
+            return
+
+        if self.data is None:
+            # Nothing to read (no uri nor bufferView): own placeholder, not shared through content hash
+            print("Image " + str(self.index) + ": no data, empty image created")
+            self.blender_image_name = bpy.data.images.new("Image_" + str(self.index), 1, 1).name
+            return
+
+        if self.get_hash() in self.gltf.blender_images.keys():
+            self.blender_image_name = self.gltf.blender_images[self.hash]
+            self.gltf.image_hits += 1
+            self.data = None
+            return
+
+        try:
+            blender_image = self.blender_create_from_memory()
+        except (TypeError, RuntimeError):
+            blender_image = self.blender_create_from_file()
+
+        blender_image.name = "Image_" + str(self.index)
+        self.blender_image_name = blender_image.name
+        self.gltf.blender_images[self.hash] = self.blender_image_name
+
+        # Image data now lives in Blender packed file
+        self.data = None
+
+    def blender_create_from_memory(self):
+        # Pack encoded data directly, Blender decodes it from the packed file
+        blender_image = bpy.data.images.new("Image_" + str(self.index), 1, 1)
+        try:
+            # Bytestring parameter only takes bytes: data uri bytearray is copied here only, and released just after
+            blender_image.pack(data=bytes(self.data), data_len=len(self.data))
+            blender_image.source = 'FILE'
+        except (TypeError, RuntimeError):
+            bpy.data.images.remove(blender_image)
+            raise
+
+        return blender_image
+
+    def blender_create_from_file(self):
         # Create a temp image, pack, and delete image
         tmp_image = tempfile.NamedTemporaryFile(delete=False)
         tmp_image.write(self.data)
@@ -69,10 +131,10 @@ class Image():
 
         blender_image = bpy.data.images.load(tmp_image.name)
         blender_image.pack()
-        blender_image.name = "Image_" + str(self.index)
-        self.blender_image_name = blender_image.name
         os.remove(tmp_image.name)
 
+        return blender_image
+
 
     def debug_missing(self):
         if self.index is None:
@@ -84,3 +146,63 @@ class Image():
         for key in self.json.keys():
             if key not in keys:
                 print("MATERIAL MISSING " + key)
+
+def collect_texture_indices(json, textures):
+    # Texture infos can be anywhere in material json (pbr, maps, extensions)
+    if isinstance(json, dict):
+        for key, value in json.items():
+            if key.endswith('Texture') and isinstance(value, dict) and 'index' in value.keys():
+                textures.add(value['index'])
+            else:
+                collect_texture_indices(value, textures)
+    elif isinstance(json, list):
+        for value in json:
+            collect_texture_indices(value, textures)
+
+def collect_images(gltf):
+    # Images used by materials of imported meshes
+    if 'images' not in gltf.json.keys() or 'textures' not in gltf.json.keys():
+        return []
+
+    textures = set()
+    for material_idx in gltf.get_imported_materials():
+        collect_texture_indices(gltf.json['materials'][material_idx], textures)
+
+    return sorted(set([gltf.json['textures'][texture_idx]['source'] for texture_idx in textures if 'source' in gltf.json['textures'][texture_idx].keys()]))
+
+def load_images(gltf, threads=0):
+    # Read and decode all used images up front, Blender images are then created from memory
+    # threads: 0 uses all cores, 1 reads serially on the calling thread
+    indices = collect_images(gltf)
+    if len(indices) == 0:
+        return
+
+    start = time.perf_counter()
+
+    images = []
+    for idx in indices:
+        if idx not in gltf.images.keys():
+            gltf.images[idx] = Image(idx, gltf.json['images'][idx], gltf)
+        image = gltf.images[idx]
+
+        # Buffers are loaded (and registered in gltf.buffers) before any worker starts
+        if 'uri' not in image.json.keys() and 'bufferView' in image.json.keys():
+            bufferview = BufferView(image.json['bufferView'], gltf.json['bufferViews'][image.json['bufferView']], gltf)
+            bufferview.read()
+
+        images.append(image)
+
+    if threads == 0:
+        threads = os.cpu_count() or 1
+    threads = min(threads, len(images))
+
+    # Content hash is computed in workers too
+    if threads <= 1:
+        for image in images:
+            image.read()
+            image.get_hash()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda image: (image.read(), image.get_hash()), images))
+
+    print("Image loading: " + str(len(images)) + " images read with " + str(threads) + " threads in " + str(round(time.perf_counter() - start, 3)) + "s")
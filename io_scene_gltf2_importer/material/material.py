@@ -21,6 +21,8 @@
  """
 
 import bpy
+import json
+import hashlib
 from .pbr import *
 from .map import *
 
@@ -131,3 +133,31 @@ class Material():
         for key in self.json.keys():
             if key not in keys:
                 print("MATERIAL MISSING " + key)
+
+def get_material_key(material_json, vertex_color):
+    # Materials with same shading json (name and extras ignored) share one Blender material
+    if material_json is None:
+        return (None, vertex_color)
+
+    canonical = dict([(key, value) for key, value in material_json.items() if key not in ['name', 'extras']])
+    digest = hashlib.sha1(json.dumps(canonical, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+    return (digest, vertex_color)
+
+def get_material(gltf, index, vertex_color):
+    # index None is the default material
+    material_json = gltf.json['materials'][index] if index is not None else None
+    key = get_material_key(material_json, vertex_color)
+
+    if key in gltf.materials.keys():
+        gltf.material_hits += 1
+        return gltf.materials[key]
+
+    material = Material(index, material_json, gltf)
+    material.read()
+    material.debug_missing()
+    if vertex_color:
+        material.use_vertex_color()
+
+    gltf.materials[key] = material
+    return material
+
@@ -20,8 +20,12 @@
  * ***** END GPL LICENSE BLOCK *****
  """
 
+import bpy
+import numpy as np
+
 from .primitive import *
 from ..rig import *
+from ..conversion import *
 
 class Mesh():
     def __init__(self, index, json, gltf):
@@ -32,6 +36,7 @@ class Mesh():
         self.target_weights = []
         self.name = None
         self.skin = None
+        self.blender_mesh_name = None # Blender mesh data, once created
 
 
     def read(self):
@@ -54,6 +59,172 @@ class Mesh():
             for weight in self.json['weights']:
                 self.target_weights.append(weight)
 
+    def blender_create(self, mesh_name):
+        # TODO mode of primitive 4 for now.
+
+        # Concatenate all primitives, with their vertex and face ranges in the mesh
+        verts = []
+        loops = []
+        vertex_offset = 0
+        face_offset = 0
+        for prim in self.primitives:
+            positions = prim.attributes['POSITION']['result']
+
+            prim.vertex_offset   = vertex_offset
+            prim.vertices_length = len(positions)
+            prim.face_offset     = face_offset
+            prim.faces_length    = len(prim.indices) // 3
+
+            verts.append(positions)
+            loops.append(prim.indices[:prim.faces_length * 3].astype(np.int32) + vertex_offset)
+
+            vertex_offset += prim.vertices_length
+            face_offset   += prim.faces_length
+
+            # manage material of primitive
+            if prim.mat:
+
+                # Create Blender material
+                if not prim.mat.blender_material:
+                    prim.mat.create_blender()
+
+        verts = convert_locations(np.concatenate(verts))
+        loops = np.concatenate(loops)
+
+        # Fill Blender mesh in bulk, triangles only
+        mesh = bpy.data.meshes.new(mesh_name)
+
+        mesh.vertices.add(vertex_offset)
+        mesh.vertices.foreach_set('co', verts.ravel())
+
+        mesh.loops.add(len(loops))
+        mesh.loops.foreach_set('vertex_index', loops)
+
+        mesh.polygons.add(face_offset)
+        mesh.polygons.foreach_set('loop_start', np.arange(0, 3 * face_offset, 3, dtype=np.int32))
+        mesh.polygons.foreach_set('loop_total', np.full(face_offset, 3, dtype=np.int32))
+
+        # One material slot per primitive, polygons use the slot of the primitive they come from
+        for prim in self.primitives:
+            mesh.materials.append(bpy.data.materials[prim.mat.blender_material])
+        material_indices = np.repeat(np.arange(len(self.primitives), dtype=np.int32), [prim.faces_length for prim in self.primitives])
+        mesh.polygons.foreach_set('material_index', material_indices)
+
+        mesh.update(calc_edges=True)
+        mesh.validate()
+
+        # Vertex index of each loop, as kept by validation
+        # Used to gather per vertex data into per loop data
+        self.loop_vertices = np.zeros(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get('vertex_index', self.loop_vertices)
+
+        self.set_normals(mesh)
+        self.set_uvs(mesh)
+        self.set_vertex_colors(mesh)
+
+        mesh.update()
+
+        return mesh
+
+    def set_normals(self, mesh):
+        if not [prim for prim in self.primitives if 'NORMAL' in prim.attributes.keys()]:
+            return # Let Blender compute normals
+
+        # Single normal array for all primitives
+        # Primitives without NORMAL keep zero normals, meaning Blender default ones
+        normals = np.zeros((len(mesh.vertices), 3), dtype=np.float32)
+        for prim in self.primitives:
+            if 'NORMAL' in prim.attributes.keys():
+                normals[prim.vertex_offset:prim.vertex_offset + prim.vertices_length] = convert_locations(prim.attributes['NORMAL']['result'])
+
+        mesh.polygons.foreach_set('use_smooth', [True] * len(mesh.polygons))
+        mesh.use_auto_smooth = True
+        mesh.normals_split_custom_set_from_vertices(normals)
+
+    def set_uvs(self, mesh):
+        texcoords = set()
+        for prim in self.primitives:
+            texcoords.update([attr for attr in prim.attributes.keys() if attr[:9] == "TEXCOORD_"])
+
+        for texcoord in sorted(texcoords, key=lambda attr: int(attr[9:])):
+            # Single per vertex array for all primitives, then gathered per loop
+            uvs = np.zeros((len(mesh.vertices), 2), dtype=np.float32)
+            for prim in self.primitives:
+                if texcoord in prim.attributes.keys():
+                    uvs[prim.vertex_offset:prim.vertex_offset + prim.vertices_length] = dequantize(prim.attributes[texcoord]['result'])
+                    prim.blender_texcoord[int(texcoord[9:])] = texcoord
+
+            uvs[:, 1] = 1 - uvs[:, 1]
+
+            mesh.uv_textures.new(texcoord)
+            mesh.uv_layers[texcoord].data.foreach_set('uv', uvs[self.loop_vertices].ravel())
+
+    def set_vertex_colors(self, mesh):
+        colors_sets = set()
+        for prim in self.primitives:
+            colors_sets.update([attr for attr in prim.attributes.keys() if attr[:6] == "COLOR_"])
+
+        for color_set in sorted(colors_sets, key=lambda attr: int(attr[6:])):
+            # Single per vertex RGBA array for all primitives, then gathered per loop
+            # Primitives without this color set stay white
+            colors = np.ones((len(mesh.vertices), 4), dtype=np.float32)
+            for prim in self.primitives:
+                if color_set in prim.attributes.keys():
+                    color_data = dequantize(prim.attributes[color_set]['result'])
+                    colors[prim.vertex_offset:prim.vertex_offset + prim.vertices_length, :color_data.shape[1]] = color_data
+
+            vertex_color = mesh.vertex_colors.new(color_set)
+            if len(mesh.loops) == 0:
+                continue
+
+            # RGB, or RGBA if this Blender version supports alpha in vertex colors
+            components = len(vertex_color.data[0].color)
+            vertex_color.data.foreach_set('color', colors[self.loop_vertices, :components].ravel())
+
+    def blender_create_shapekeys(self, obj):
+        max_shape_to_create = 0
+        for prim in self.primitives:
+            if len(prim.targets) > max_shape_to_create:
+                max_shape_to_create = len(prim.targets)
+
+        if max_shape_to_create == 0:
+            return
+
+        # Create basis shape key
+        obj.shape_key_add("Basis")
+
+        base = np.zeros(len(obj.data.vertices) * 3, dtype=np.float32)
+        obj.data.vertices.foreach_get('co', base)
+        base = base.reshape(-1, 3)
+
+        for i in range(max_shape_to_create):
+
+            shape_key = obj.shape_key_add("target_" + str(i), from_mix=False) #TODO name (can be in json file)
+
+            # Shape positions of all primitives: base positions + target deltas
+            shape = base.copy()
+            for prim in self.primitives:
+                if i >= len(prim.targets) or 'POSITION' not in prim.targets[i].keys():
+                    continue
+
+                target = prim.targets[i]['POSITION']
+                if 'sparse' in target.keys():
+                    # Only displaced vertices are moved
+                    indices, values = target['sparse']
+                    shape[prim.vertex_offset + indices.astype(np.int64)] += convert_locations(values)
+                else:
+                    shape[prim.vertex_offset:prim.vertex_offset + prim.vertices_length] += convert_locations(target['result'])
+
+            shape_key.data.foreach_set('co', shape.ravel())
+
+            # set default weight for shape key, and name
+            if i < len(self.target_weights):
+                shape_key.value = self.target_weights[i]
+
+            if i < len(self.primitives[0].targets) and 'POSITION' in self.primitives[0].targets[i].keys():
+                if self.primitives[0].targets[i]['POSITION']['accessor'].name:
+                    shape_key.name = self.primitives[0].targets[i]['POSITION']['accessor'].name
+
     def rig(self, skin_id, mesh_id):
         if skin_id not in self.gltf.skins.keys():
             self.skin = Skin(skin_id, self.gltf.json['skins'][skin_id], self.gltf)
@@ -20,6 +20,8 @@
  * ***** END GPL LICENSE BLOCK *****
  """
 
+import numpy as np
+
 from ..buffer import *
 from ..material import *
 
@@ -48,44 +50,18 @@ class Primitive():
         if 'indices' in self.json.keys():
             print("Primitive indices")
             self.accessor = Accessor(self.json['indices'], self.gltf.json['accessors'][self.json['indices']], self.gltf)
-            self.indices  = self.accessor.read()
-            self.indices  = [ind[0] for ind in self.indices]
+            self.indices  = self.accessor.read()[:, 0]
             self.accessor.debug_missing()
         else:
-            self.indices = range(0, len(self.attributes['POSITION']['result']))
+            self.indices = np.arange(0, len(self.attributes['POSITION']['result']), dtype=np.uint32)
 
 
-        # reading materials
+        # reading materials, shared by all primitives with same material json and vertex color use
+        # If there is a COLOR_0, we are going to use it in material
         if 'material' in self.json.keys():
-            # create material if not already exits
-            if self.json['material'] not in self.gltf.materials.keys():
-                self.mat = Material(self.json['material'], self.gltf.json['materials'][self.json['material']], self.gltf)
-                self.mat.read()
-                self.mat.debug_missing()
-                self.gltf.materials[self.json['material']] = self.mat
-
-                if 'COLOR_0' in self.attributes.keys():
-                    self.mat.use_vertex_color()
-
-            else:
-                # Use already existing material
-                self.mat = self.gltf.materials[self.json['material']]
-
+            self.mat = get_material(self.gltf, self.json['material'], 'COLOR_0' in self.attributes.keys())
         else:
-            # If there is a COLOR_0, we are going to use it in material
-            if 'COLOR_0' in self.attributes.keys():
-                self.mat = Material(None, None, self.gltf)
-                self.mat.read()
-                self.mat.debug_missing()
-                self.mat.use_vertex_color()
-            else:
-                # No material, use default one
-                if self.gltf.default_material is None:
-                    self.gltf.default_material = Material(None, None, self.gltf)
-                    self.gltf.default_material.read()
-                    self.gltf.default_material.debug_missing()
-
-                self.mat = self.gltf.default_material
+            self.mat = get_material(self.gltf, None, 'COLOR_0' in self.attributes.keys())
 
         # reading targets (shapekeys) if any
         if 'targets' in self.json.keys():
@@ -94,7 +70,11 @@ class Primitive():
                 for attr in targ.keys():
                     target[attr] = {}
                     target[attr]['accessor'] = Accessor(targ[attr], self.gltf.json['accessors'][targ[attr]], self.gltf)
-                    target[attr]['result']   = target[attr]['accessor'].read()
+                    if target[attr]['accessor'].is_sparse_only():
+                        # Keep only displaced vertices, instead of a mostly zero array
+                        target[attr]['sparse'] = target[attr]['accessor'].read_sparse()
+                    else:
+                        target[attr]['result'] = target[attr]['accessor'].read()
                     target[attr]['accessor'].debug_missing()
                 self.targets.append(target)
 
@@ -111,8 +91,11 @@ class Primitive():
                 'NORMAL',
                 'TEXCOORD_0',
                 'TEXCOORD_1',
+                'COLOR_0',
                 'JOINTS_0',
-                'WEIGHTS_0'
+                'JOINTS_1',
+                'WEIGHTS_0',
+                'WEIGHTS_1'
         ]
 
         for key in self.json.keys():
@@ -21,12 +21,13 @@
  """
 
 import bpy
-import bmesh
+import numpy as np
 
 from mathutils import Matrix, Vector, Quaternion
 
 from ..mesh import *
 from ..camera import *
+from ..animation import *
 
 class Node():
     def __init__(self, index, json, gltf, root, scene):
@@ -42,6 +43,7 @@ class Node():
         self.anims = []
         self.is_joint = False
         self.parent = None
+        self.ancestors_transform = None # Set by scene for roots that are not scene roots
 
     def read(self):
         if 'name' in self.json.keys():
@@ -53,13 +55,25 @@ class Node():
 
         self.transform = self.get_transforms()
 
-        if 'mesh' in self.json.keys():
-            self.mesh = Mesh(self.json['mesh'], self.gltf.json['meshes'][self.json['mesh']], self.gltf)
-            self.mesh.read()
-            self.mesh.debug_missing()
+        if 'mesh' in self.json.keys() and self.gltf.plan.is_mesh_imported(self.json['mesh']):
+            # Nodes instancing the same mesh (with same skin) share its data
+            # Shape keys belong to mesh data: a node with animated weights gets its own mesh, or animations of all instances would be merged
+            if self.index in self.gltf.get_weights_animated_nodes():
+                mesh_key = (self.json['mesh'], self.json['skin'] if 'skin' in self.json.keys() else None, self.index)
+            else:
+                mesh_key = (self.json['mesh'], self.json['skin'] if 'skin' in self.json.keys() else None)
+            if mesh_key in self.gltf.meshes.keys():
+                self.mesh = self.gltf.meshes[mesh_key]
+                self.gltf.mesh_instances += 1
+            else:
+                self.mesh = Mesh(self.json['mesh'], self.gltf.json['meshes'][self.json['mesh']], self.gltf)
+                self.mesh.read()
+                self.mesh.debug_missing()
+
+                if 'skin' in self.json.keys():
+                    self.mesh.rig(self.json['skin'], self.index)
 
-            if 'skin' in self.json.keys():
-                self.mesh.rig(self.json['skin'], self.index)
+                self.gltf.meshes[mesh_key] = self.mesh
 
         if 'camera' in self.json.keys():
             self.camera = Camera(self.json['camera'], self.name, self.gltf.json['cameras'][self.json['camera']], self.gltf)
@@ -115,7 +129,10 @@ class Node():
     def get_transforms(self):
 
         if 'matrix' in self.json.keys():
-            return self.convert_matrix(self.json['matrix'])
+            mat = self.convert_matrix(self.json['matrix'])
+            if self.ancestors_transform is not None:
+                mat = self.ancestors_transform * mat
+            return mat
 
         mat = Matrix()
 
@@ -137,6 +154,10 @@ class Node():
         if 'translation' in self.json.keys():
             mat = Matrix.Translation(Vector(self.convert_location(self.json['translation']))) * mat
 
+        # Root of a selected subtree: transforms of its ancestors, that are not imported, are baked in
+        if self.ancestors_transform is not None:
+            mat = self.ancestors_transform * mat
+
         return mat
 
 
@@ -149,7 +170,8 @@ class Node():
         if parent is None:
             return
 
-        for node in self.gltf.scene.nodes.values(): # TODO if parent is in another scene
+        # Parent is always in the scene of this node
+        for node in self.scene.nodes.values():
             if node.index == parent:
                 if node.blender_object:
                     obj.parent = bpy.data.objects[node.blender_object]
@@ -157,168 +179,230 @@ class Node():
 
         print("ERROR, parent not found")
 
+    def get_bone_parent_matrix(self, obj):
+        if not self.scene.nodes[self.parent].is_joint:
+            return self.scene.nodes[self.parent].get_transforms()
+        else:
+            return obj.pose.bones[self.scene.nodes[self.parent].blender_bone_name].matrix
+
+    def get_bone_anim_matrix(self, obj, bone, transform, delta):
+        if self.parent is None:
+            mat = transform
+        else:
+            parent_mat = self.get_bone_parent_matrix(obj)
+
+            # Key scale is applied in bone space, before parent rotation (as when there is no parent)
+            s = transform.to_scale()
+            scale = Matrix([
+                [s[0], 0, 0, 0],
+                [0, s[1], 0, 0],
+                [0, 0, s[2], 0],
+                [0, 0, 0, 1]
+            ])
+
+            mat = (parent_mat.to_quaternion() * delta.inverted() * transform.to_quaternion() * delta).to_matrix().to_4x4() * scale
+            mat = Matrix.Translation(parent_mat.to_translation() + ( parent_mat.to_quaternion() * delta.inverted() * transform.to_translation() )) * mat
+
+        return obj.convert_space(bone, mat, 'WORLD', 'LOCAL')
+
+    def convert_bone_anim_per_key(self, obj, bone, anim, delta):
+        # Reference conversion: matrices composition and convert_space call for each key
+        # CUBICSPLINE tangents go through the linear part of the conversion of their key
+        values = []
+        in_tangents = []
+        out_tangents = []
+        cubic = anim.in_tangents is not None
+
+        if anim.path == "translation":
+            # Conversion is affine: linear part is conversion minus conversion of origin
+            origin = self.get_bone_anim_matrix(obj, bone, Matrix.Identity(4), delta).to_translation()
+
+            def convert(key):
+                transform = Matrix.Translation(self.convert_location(list(key)))
+                return self.get_bone_anim_matrix(obj, bone, transform, delta).to_translation()
+
+            for idx, key in enumerate(anim.values):
+                values.append(convert(key))
+                if cubic:
+                    in_tangents.append(convert(anim.in_tangents[idx]) - origin)
+                    out_tangents.append(convert(anim.out_tangents[idx]) - origin)
+
+        elif anim.path == "rotation":
+            # Per key, converted value is left * key * right: tangents get same left and right quaternions
+            if self.parent is None:
+                right = Quaternion()
+            else:
+                right = delta
+
+            for idx, key in enumerate(anim.values):
+                q = self.convert_quaternion(key)
+                value = self.get_bone_anim_matrix(obj, bone, q.to_matrix().to_4x4(), delta).to_quaternion()
+                values.append(value)
+                if cubic:
+                    left = value * right.inverted() * q.inverted()
+                    in_tangents.append(left * self.convert_quaternion(anim.in_tangents[idx]) * right)
+                    out_tangents.append(left * self.convert_quaternion(anim.out_tangents[idx]) * right)
+
+        elif anim.path == "scale":
+            # Key scale is multiplied by scale of conversion on each axis
+            factor = np.array(self.get_bone_anim_matrix(obj, bone, Matrix.Identity(4), delta).to_scale(), dtype=np.float32)
+
+            for idx, key in enumerate(anim.values):
+                s = self.convert_scale(list(key))
+                transform = Matrix([
+                    [s[0], 0, 0, 0],
+                    [0, s[1], 0, 0],
+                    [0, 0, s[2], 0],
+                    [0, 0, 0, 1]
+                ])
+                values.append(self.get_bone_anim_matrix(obj, bone, transform, delta).to_scale())
+                if cubic:
+                    in_tangents.append(convert_scales(anim.in_tangents[idx:idx+1])[0] * factor)
+                    out_tangents.append(convert_scales(anim.out_tangents[idx:idx+1])[0] * factor)
+
+        values = np.array(values, dtype=np.float32)
+
+        # to_quaternion picks a sign per key: keep keys in same hemisphere, as batched conversion does
+        signs = 1.0
+        if anim.path == "rotation":
+            signs = quaternions_continuity_signs(values)
+            values *= signs
+
+        tangents = None
+        if cubic:
+            tangents = (np.array(in_tangents, dtype=np.float32) * signs, np.array(out_tangents, dtype=np.float32) * signs)
+
+        return values, tangents
+
+    def convert_bone_anim(self, obj, bone, anim, delta):
+        # Batched conversion. Per key, bone local matrix is A * mat(key):
+        # A (world => bone local space) and parent transforms are computed once,
+        # then all keys are converted with array operations
+        A = obj.convert_space(bone, Matrix.Identity(4), 'WORLD', 'LOCAL')
+        A3 = A.to_3x3()
+
+        # Rotations are converted by quaternion products, which needs A without non uniform scale
+        a3 = np.array(A3)
+        gram = np.dot(a3, a3.T)
+        if not np.allclose(gram, np.eye(3) * np.trace(gram) / 3.0, atol=1e-5):
+            return self.convert_bone_anim_per_key(obj, bone, anim, delta)
+
+        if self.parent is None:
+            parent_rot = Quaternion()
+            parent_loc = Vector((0.0, 0.0, 0.0))
+            post = Quaternion()
+        else:
+            parent_mat = self.get_bone_parent_matrix(obj)
+            parent_rot = parent_mat.to_quaternion()
+            parent_loc = parent_mat.to_translation()
+            post = delta
+        pre = parent_rot * post.inverted()
+
+        # Linear part of the conversion is also applied to CUBICSPLINE tangents
+        signs = 1.0
+        if anim.path == "translation":
+            loc_matrix = np.array(A3 * pre.to_matrix(), dtype=np.float32)
+            loc_offset = np.array(A3 * parent_loc + A.to_translation(), dtype=np.float32)
+
+            def convert(data):
+                return np.dot(convert_locations(data), loc_matrix.T)
+
+            values = convert(anim.values) + loc_offset
+
+        elif anim.path == "rotation":
+            left  = np.array(A.to_quaternion() * pre, dtype=np.float32)
+            right = np.array(post, dtype=np.float32)
+
+            def convert(data):
+                return quaternion_multiply(quaternion_multiply(left, convert_quaternions(data)), right)
+
+            values = convert(anim.values)
+            values /= np.linalg.norm(values, axis=1)[:, np.newaxis]
+            signs = quaternions_continuity_signs(values)
+            values *= signs
+
+        elif anim.path == "scale":
+            scale_factor = np.linalg.norm(np.array(A3 * parent_rot.to_matrix(), dtype=np.float32), axis=0)
+
+            def convert(data):
+                return convert_scales(data) * scale_factor
+
+            values = convert(anim.values)
+
+        tangents = None
+        if anim.in_tangents is not None:
+            tangents = (convert(anim.in_tangents) * signs, convert(anim.out_tangents) * signs)
+
+        return values, tangents
+
     def blender_bone_create_anim(self):
         obj   = bpy.data.objects[self.gltf.skins[self.skin_id].blender_armature_name]
         bone  = obj.pose.bones[self.blender_bone_name]
         fps = bpy.context.scene.render.fps
         delta = Quaternion((0.7071068286895752, 0.7071068286895752, 0.0, 0.0))
 
-        first_anim = True
+        # glTF path => Blender path, fcurve group
+        blender_paths = {
+            "translation": ("location", 'location'),
+            "rotation": ("rotation_quaternion", 'rotation'),
+            "scale": ("scale", 'scale')
+        }
+
         for anim in self.anims:
+            if anim.path not in blender_paths.keys():
+                continue
+
+            if self.gltf.import_settings['bone_anim_per_key']:
+                values, tangents = self.convert_bone_anim_per_key(obj, bone, anim, delta)
+            else:
+                values, tangents = self.convert_bone_anim(obj, bone, anim, delta)
 
-            if anim.path == "translation":
-                blender_path = "location"
-                for key in anim.data:
-                    transform = Matrix.Translation(self.convert_location(list(key[1])))
-                    if not self.parent:
-                        mat = transform
-                    else:
-                        if not self.gltf.scene.nodes[self.parent].is_joint:
-                            parent_mat = self.gltf.scene.nodes[self.parent].get_transforms()
-                        else:
-                            parent_mat = obj.pose.bones[self.gltf.scene.nodes[self.parent].blender_bone_name].matrix # Node in another scene
-
-                        mat = (parent_mat.to_quaternion() * delta.inverted() * transform.to_quaternion() * delta).to_matrix().to_4x4()
-                        mat = Matrix.Translation(parent_mat.to_translation() + ( parent_mat.to_quaternion() * delta.inverted() * transform.to_translation() )) * mat
-
-                    mat = obj.convert_space(bone, mat, 'WORLD', 'LOCAL')
-                    bone.location = mat.to_translation()
-                    bone.keyframe_insert(blender_path, frame = key[0] * fps, group='location')
-
-
-                # Setting interpolation
-                for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                    for kf in fcurve.keyframe_points:
-                        self.set_interpolation(anim.interpolation, kf)
-
-            elif anim.path == "rotation":
-                blender_path = "rotation_quaternion"
-                for key in anim.data:
-                    transform = (self.convert_quaternion(key[1])).to_matrix().to_4x4()
-                    if not self.parent:
-                        mat = transform
-                    else:
-                        if not self.gltf.scene.nodes[self.parent].is_joint:
-                            parent_mat = self.gltf.scene.nodes[self.parent].get_transforms()
-                        else:
-                            parent_mat = obj.pose.bones[self.gltf.scene.nodes[self.parent].blender_bone_name].matrix # Node in another scene
-
-                        mat = (parent_mat.to_quaternion() * delta.inverted() * transform.to_quaternion() * delta).to_matrix().to_4x4()
-                        mat = Matrix.Translation(parent_mat.to_translation() + ( parent_mat.to_quaternion() * delta.inverted() * transform.to_translation() )) * mat
-
-                    mat = obj.convert_space(bone, mat, 'WORLD', 'LOCAL')
-                    bone.rotation_quaternion = mat.to_quaternion()
-                    bone.keyframe_insert(blender_path, frame = key[0] * fps, group='rotation')
-
-                # Setting interpolation
-                for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                    for kf in fcurve.keyframe_points:
-                        self.set_interpolation(anim.interpolation, kf)
-
-
-            elif anim.path == "scale":
-                blender_path = "scale"
-                for key in anim.data:
-                    s = self.convert_scale(list(key[1]))
-                    transform = Matrix([
-                        [s[0], 0, 0, 0],
-                        [0, s[1], 0, 0],
-                        [0, 0, s[2], 0],
-                        [0, 0, 0, 1]
-                    ])
-
-                    if not self.parent:
-                        mat = transform
-                    else:
-                        if not self.gltf.scene.nodes[self.parent].is_joint:
-                            parent_mat = self.gltf.scene.nodes[self.parent].get_transforms()
-                        else:
-                            parent_mat = obj.pose.bones[self.gltf.scene.nodes[self.parent].blender_bone_name].matrix # Node in another scene
-
-                        mat = (parent_mat.to_quaternion() * delta.inverted() * transform.to_quaternion() * delta).to_matrix().to_4x4()
-                        mat = Matrix.Translation(parent_mat.to_translation() + ( parent_mat.to_quaternion() * delta.inverted() * transform.to_translation() )) * mat
-
-                    mat = obj.convert_space(bone, mat, 'WORLD', 'LOCAL')
-                    bone.scale = mat.to_scale()
-                    bone.keyframe_insert(blender_path, frame = key[0] * fps, group='scale')
-
-                # Setting interpolation
-                for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                    for kf in fcurve.keyframe_points:
-                        self.set_interpolation(anim.interpolation, kf)
-
-            if first_anim == True:
-                first_anim = False
-                if anim.anim.name and obj.animation_data and obj.animation_data.action:
-                    obj.animation_data.action.name = anim.anim.name
+            if tangents is not None:
+                tangents = (tangents[0] / fps, tangents[1] / fps)
+
+            blender_path, group = blender_paths[anim.path]
+            action = get_action(obj, anim.anim.name)
+            set_fcurves(action, bone.path_from_id(blender_path), anim.times * fps, values, anim.interpolation, group, tangents)
 
     def blender_create_anim(self):
         obj = bpy.data.objects[self.blender_object]
         fps = bpy.context.scene.render.fps
-        first_anim = True
+
+        # glTF path => Blender path, fcurve group, conversion
+        blender_paths = {
+            "translation": ("location", 'location', convert_locations),
+            "rotation": ("rotation_quaternion", 'rotation', convert_quaternions),
+            "scale": ("scale", 'scale', convert_scales)
+        }
+
         for anim in self.anims:
-            if anim.path in ['translation', 'rotation', 'scale']:
-
-                if anim.path == "translation":
-                    blender_path = "location"
-                    for key in anim.data:
-                       obj.location = Vector(self.convert_location(list(key[1])))
-                       obj.keyframe_insert(blender_path, frame = key[0] * fps, group='location')
-
-                    # Setting interpolation
-                    for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                        for kf in fcurve.keyframe_points:
-                            self.set_interpolation(anim.interpolation, kf)
-
-                elif anim.path == "rotation":
-                    blender_path = "rotation_quaternion"
-                    for key in anim.data:
-                        obj.rotation_quaternion = self.convert_quaternion(key[1])
-                        obj.keyframe_insert(blender_path, frame = key[0] * fps, group='rotation')
-
-                    # Setting interpolation
-                    for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                        for kf in fcurve.keyframe_points:
-                            self.set_interpolation(anim.interpolation, kf)
-
-
-                elif anim.path == "scale":
-                    blender_path = "scale"
-                    for key in anim.data:
-                        obj.scale = Vector(self.convert_scale(list(key[1])))
-                        obj.keyframe_insert(blender_path, frame = key[0] * fps, group='scale')
-
-                    # Setting interpolation
-                    for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                        for kf in fcurve.keyframe_points:
-                            self.set_interpolation(anim.interpolation, kf)
+            frames = anim.times * fps
+
+            # CUBICSPLINE tangents, per frame
+            tangents = None
+            if anim.in_tangents is not None:
+                tangents = (anim.in_tangents / fps, anim.out_tangents / fps)
+
+            if anim.path in blender_paths.keys():
+                blender_path, group, convert = blender_paths[anim.path]
+                if tangents is not None:
+                    tangents = (convert(tangents[0]), convert(tangents[1]))
+
+                action = get_action(obj, anim.anim.name)
+                set_fcurves(action, blender_path, frames, convert(anim.values), anim.interpolation, group, tangents)
 
             elif anim.path == 'weights':
-                cpt_sk = 0
-                for sk in anim.data:
-                    for key in sk:
-                        obj.data.shape_keys.key_blocks[cpt_sk+1].value = key[1]
-                        obj.data.shape_keys.key_blocks[cpt_sk+1].keyframe_insert("value", frame=key[0] * fps, group='ShapeKeys')
-
-                    cpt_sk += 1
-
-            if first_anim == True:
-                first_anim = False
-                if anim.anim.name and obj.animation_data and obj.animation_data.action:
-                    obj.animation_data.action.name = anim.anim.name
-
-    def set_interpolation(self, interpolation, kf):
-        if interpolation == "LINEAR":
-            kf.interpolation = 'LINEAR'
-        elif interpolation == "STEP":
-            kf.interpolation = 'CONSTANT'
-        elif interpolation == "CATMULLROMSPLINE":
-            kf.interpolation = 'BEZIER' #TODO
-        elif interpolation == "CUBICSPLINE":
-            kf.interpolation = 'BEZIER' #TODO
-        else:
-            print("Unknown interpolation : " + self.interpolation)
-            kf.interpolation = 'BEZIER'
+                if obj.type != 'MESH' or obj.data.shape_keys is None:
+                    continue
+
+                shape_keys = obj.data.shape_keys
+                action = get_action(shape_keys, anim.anim.name)
+                for cpt_sk in range(anim.values.shape[1]):
+                    key_block = shape_keys.key_blocks[cpt_sk+1]
+                    key_tangents = None
+                    if tangents is not None:
+                        key_tangents = (tangents[0][:, cpt_sk:cpt_sk+1], tangents[1][:, cpt_sk:cpt_sk+1])
+                    set_fcurves(action, key_block.path_from_id("value"), frames, anim.values[:, cpt_sk:cpt_sk+1], anim.interpolation, 'ShapeKeys', key_tangents)
 
     def blender_create(self, parent):
         self.parent = parent
@@ -339,59 +423,20 @@ class Node():
                 else:
                     name = "Object_" + str(self.index)
 
-            # Geometry
-            if self.mesh.name:
-                mesh_name = self.mesh.name
+            # Geometry, created once and linked by all instances
+            instance = self.mesh.blender_mesh_name is not None
+            if instance:
+                mesh = bpy.data.meshes[self.mesh.blender_mesh_name]
             else:
-                mesh_name = "Mesh_" + str(self.index)
-
-            mesh = bpy.data.meshes.new(mesh_name)
-            # TODO mode of primitive 4 for now.
-            # TODO move some parts on mesh / primitive classes ?
-            verts = []
-            edges = []
-            faces = []
-            for prim in self.mesh.primitives:
-                current_length = len(verts)
-                prim_verts = [self.convert_location(vert) for vert in prim.attributes['POSITION']['result']]
-                prim.vertices_length = len(prim_verts)
-                verts.extend(prim_verts)
-                prim_faces = []
-                for i in range(0, len(prim.indices), 3):
-                    vals = prim.indices[i:i+3]
-                    new_vals = []
-                    for y in vals:
-                        new_vals.append(y+current_length)
-                    prim_faces.append(tuple(new_vals))
-                faces.extend(prim_faces)
-                prim.faces_length = len(prim_faces)
-
-                # manage material of primitive
-                if prim.mat:
-
-                    # Create Blender material
-                    if not prim.mat.blender_material:
-                        prim.mat.create_blender()
-
-            mesh.from_pydata(verts, edges, faces)
-            mesh.validate()
-
-
-            # Normals
-            offset = 0
-            for prim in self.mesh.primitives:
-                for poly in mesh.polygons:
-                    for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                        vert_idx = mesh.loops[loop_idx].vertex_index
-                        if vert_idx in range(offset, offset + prim.vertices_length):
-                            if offset != 0:
-                                cpt_vert = vert_idx % offset
-                            else:
-                                cpt_vert = vert_idx
-                            mesh.vertices[vert_idx].normal = prim.attributes['NORMAL']['result'][cpt_vert]
-            offset = offset + prim.vertices_length
-
-            mesh.update()
+                if self.mesh.name:
+                    mesh_name = self.mesh.name
+                else:
+                    mesh_name = "Mesh_" + str(self.index)
+
+                mesh = self.mesh.blender_create(mesh_name)
+                mesh.update()
+                self.mesh.blender_mesh_name = mesh.name
+
             obj = bpy.data.objects.new(name, mesh)
             obj.rotation_mode = 'QUATERNION'
             bpy.data.scenes[self.gltf.blender.scene].objects.link(obj)
@@ -399,112 +444,14 @@ class Node():
             self.blender_object = obj.name
             self.set_parent(obj, parent)
 
-            # manage UV
-            offset = 0
-            for prim in self.mesh.primitives:
-                for texcoord in [attr for attr in prim.attributes.keys() if attr[:9] == "TEXCOORD_"]:
-                    if not texcoord in mesh.uv_textures:
-                        mesh.uv_textures.new(texcoord)
-                        prim.blender_texcoord[int(texcoord[9:])] = texcoord
-
-                    for poly in mesh.polygons:
-                        for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                            vert_idx = mesh.loops[loop_idx].vertex_index
-                            if vert_idx in range(offset, offset + prim.vertices_length):
-                                obj.data.uv_layers[texcoord].data[loop_idx].uv = Vector((prim.attributes[texcoord]['result'][vert_idx-offset][0], 1-prim.attributes[texcoord]['result'][vert_idx-offset][1]))
-
-                offset = offset + prim.vertices_length
-
-            mesh.update()
-
-            # Object and UV are now created, we can set UVMap into material
-            for prim in self.mesh.primitives:
-                if prim.mat.pbr.color_type in [prim.mat.pbr.TEXTURE, prim.mat.pbr.TEXTURE_FACTOR] :
-                    prim.mat.set_uvmap(prim, obj)
-
-            # Assign materials to mesh
-            offset = 0
-            cpt_index_mat = 0
-            bm = bmesh.new()
-            bm.from_mesh(obj.data)
-            bm.faces.ensure_lookup_table()
-            for prim in self.mesh.primitives:
-                obj.data.materials.append(bpy.data.materials[prim.mat.blender_material])
-                for vert in bm.verts:
-                    if vert.index in range(offset, offset + prim.vertices_length):
-                        for loop in vert.link_loops:
-                            face = loop.face.index
-                            bm.faces[face].material_index = cpt_index_mat
-                cpt_index_mat += 1
-                offset = offset + prim.vertices_length
-            bm.to_mesh(obj.data)
-            bm.free()
-
-            # Create shapekeys if needed
-            max_shape_to_create = 0
-            for prim in self.mesh.primitives:
-                if len(prim.targets) > max_shape_to_create:
-                    max_shape_to_create = len(prim.targets)
-
-            # Create basis shape key
-            if max_shape_to_create > 0:
-                obj.shape_key_add("Basis")
-
-            for i in range(max_shape_to_create):
-
-                obj.shape_key_add("target_" + str(i)) #TODO name (can be in json file)
-
+            if not instance:
+                # Object and UV are now created, we can set UVMap into material
                 for prim in self.mesh.primitives:
-                    if i > len(prim.targets):
-                        continue
-
-                    bm = bmesh.new()
-                    bm.from_mesh(mesh)
-
-                    shape_layer = bm.verts.layers.shape[i+1]
-                    vert_idx = 0
-                    for vert in bm.verts:
-                        shape = vert[shape_layer]
-                        co = self.convert_location(list(prim.targets[i]['POSITION']['result'][vert_idx]))
-                        shape.x = obj.data.vertices[vert_idx].co.x + co[0]
-                        shape.y = obj.data.vertices[vert_idx].co.y + co[1]
-                        shape.z = obj.data.vertices[vert_idx].co.z + co[2]
-
-                        vert_idx += 1
-
-                    bm.to_mesh(obj.data)
-                    bm.free()
-
-            # set default weights for shape keys, and names
-            for i in range(max_shape_to_create):
-                if i < len(self.mesh.target_weights):
-                    obj.data.shape_keys.key_blocks[i+1].value = self.mesh.target_weights[i]
-                    if self.mesh.primitives[0].targets[i]['POSITION']['accessor'].name:
-                       obj.data.shape_keys.key_blocks[i+1].name  = self.mesh.primitives[0].targets[i]['POSITION']['accessor'].name
-
-
-            # Apply vertex color.
-            vertex_color = None
-            offset = 0
-            for prim in self.mesh.primitives:
-                if 'COLOR_0' in prim.attributes.keys():
-                    # Create vertex color, once only per object
-                    if vertex_color is None:
-                        vertex_color = obj.data.vertex_colors.new("COLOR_0")
-
-                    color_data = prim.attributes['COLOR_0']['result']
-
-                    for poly in mesh.polygons:
-                        for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                            vert_idx = mesh.loops[loop_idx].vertex_index
-                            if vert_idx in range(offset, offset + prim.vertices_length):
-                                if offset != 0:
-                                    cpt_idx = vert_idx % offset
-                                else:
-                                    cpt_idx = vert_idx
-                                vertex_color.data[loop_idx].color = color_data[cpt_idx][0:3]
-                                #TODO : no alpha in vertex color
-                offset = offset + prim.vertices_length
+                    if prim.mat.pbr.color_type in [prim.mat.pbr.TEXTURE, prim.mat.pbr.TEXTURE_FACTOR] :
+                        prim.mat.set_uvmap(prim, obj)
+
+                # Create shapekeys if needed (stored in mesh data, shared by instances)
+                self.mesh.blender_create_shapekeys(obj)
 
             for child in self.children:
                 child.blender_create(self.index)
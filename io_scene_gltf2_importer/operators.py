@@ -0,0 +1,153 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import bpy
+from bpy_extras.io_utils import ImportHelper
+from bpy.types import Operator
+from bpy.props import IntProperty, FloatProperty, StringProperty, BoolProperty
+
+from .io import *
+from .scene import *
+
+#TODO reloading stuff
+
+class ImportglTF2(Operator, ImportHelper):
+    bl_idname = 'import_scene.gltf2'
+    bl_label  = "Import glTF2"
+
+    accessor_cache_budget = IntProperty(
+            name="Accessor Cache (MB)",
+            description="Memory budget for decoded accessors shared between meshes and animations, 0 for no limit",
+            default=0,
+            min=0
+            )
+
+    anim_simplify_tolerance = FloatProperty(
+            name="Simplify Animation",
+            description="Remove animation keys that interpolation of their neighbours rebuilds within this error (radians for rotations), 0 keeps all keys",
+            default=0.0,
+            min=0.0,
+            precision=4
+            )
+
+    decode_threads = IntProperty(
+            name="Decode Threads",
+            description="Threads used to decode accessors and read images, 0 for all cores, 1 to decode serially",
+            default=0,
+            min=0
+            )
+
+    import_scenes = StringProperty(
+            name="Scenes",
+            description="Scenes to import, as comma separated indices or names, empty for all",
+            default=""
+            )
+
+    import_nodes = StringProperty(
+            name="Nodes",
+            description="Node subtrees to import, as comma separated indices or names, empty for all",
+            default=""
+            )
+
+    import_animations = StringProperty(
+            name="Animations",
+            description="Animations to import, as comma separated indices or names, empty for all",
+            default=""
+            )
+
+    import_meshes = StringProperty(
+            name="Meshes",
+            description="Meshes to import (e.g. one LOD), as comma separated indices or names, empty for all",
+            default=""
+            )
+
+    use_cache = BoolProperty(
+            name="Use Import Cache",
+            description="Keep decoded data on disk, so that next imports of this unchanged file skip parsing and decoding",
+            default=False
+            )
+
+    cache_dir = StringProperty(
+            name="Cache Directory",
+            description="Directory of import cache, empty for default one in temporary directory",
+            default="",
+            subtype='DIR_PATH'
+            )
+
+    cache_max_size = IntProperty(
+            name="Cache Size (MB)",
+            description="Max size of import cache, least recently used files are evicted first, 0 for no limit",
+            default=2048,
+            min=0
+            )
+
+    def execute(self, context):
+        return self.import_gltf2(context)
+
+    def import_gltf2(self, context):
+        bpy.context.scene.render.engine = 'CYCLES'
+        import_settings = {
+            'accessor_cache_budget': self.accessor_cache_budget * 1024 * 1024,
+            'anim_simplify_tolerance': self.anim_simplify_tolerance,
+            'decode_threads': self.decode_threads,
+            'import_plan': ImportPlan(
+                scenes=parse_selection(self.import_scenes),
+                nodes=parse_selection(self.import_nodes),
+                animations=parse_selection(self.import_animations),
+                meshes=parse_selection(self.import_meshes)
+            ),
+            'cache_dir': None,
+            'cache_max_size': self.cache_max_size * 1024 * 1024
+        }
+        if self.use_cache:
+            import_settings['cache_dir'] = self.cache_dir if self.cache_dir else get_default_cache_directory()
+        self.gltf = glTFImporter(self.filepath, import_settings)
+        success, txt = self.gltf.read()
+        if not success:
+            self.gltf.close()
+            self.report({'ERROR'}, txt)
+            return {'CANCELLED'}
+        self.gltf.blender_create()
+        self.gltf.debug_missing()
+        self.gltf.close()
+
+        return {'FINISHED'}
+
+class ClearglTF2Cache(Operator):
+    bl_idname = 'import_scene.gltf2_clear_cache'
+    bl_label  = "Clear glTF2 Import Cache"
+
+    cache_dir = StringProperty(
+            name="Cache Directory",
+            description="Directory of import cache, empty for default one in temporary directory",
+            default="",
+            subtype='DIR_PATH'
+            )
+
+    def execute(self, context):
+        cache = DiskCache(self.cache_dir if self.cache_dir else get_default_cache_directory())
+        nb = cache.clear()
+        self.report({'INFO'}, "glTF2 import cache: " + str(nb) + " entries removed")
+        return {'FINISHED'}
+
+def menu_func_import(self, context):
+    self.layout.operator(ImportglTF2.bl_idname, text=ImportglTF2.bl_label)
@@ -0,0 +1,346 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from os.path import abspath, dirname, exists, getsize, isdir, join
+
+CACHE_VERSION = 1
+HASH_CHUNK_SIZE = 16 * 1024 * 1024
+IN_USE_TIMEOUT = 24 * 3600 # Seconds after which an in use mark (left by a crashed import) or a temp directory is ignored
+
+def get_default_cache_directory():
+    return join(tempfile.gettempdir(), 'gltf2_importer_cache')
+
+def get_file_hash(filename):
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(filename, 'rb') as f:
+        chunk = f.read(HASH_CHUNK_SIZE)
+        while chunk:
+            file_hash.update(chunk)
+            chunk = f.read(HASH_CHUNK_SIZE)
+
+    return file_hash.hexdigest()
+
+def get_dependencies(filename, gltf_json):
+    # External buffers and images: a change there invalidates the entry too
+    dependencies = {}
+    for key in ['buffers', 'images']:
+        if key not in gltf_json.keys():
+            continue
+        for item in gltf_json[key]:
+            if 'uri' not in item.keys() or item['uri'][:5] == 'data:':
+                continue
+            path = join(dirname(filename), item['uri'])
+            if exists(path):
+                stat = os.stat(path)
+                dependencies[item['uri']] = [stat.st_size, stat.st_mtime_ns]
+
+    return dependencies
+
+def get_stored_json(gltf_json):
+    # Data uri payloads are not stored, they are read again from file if ever needed
+    stored_json = dict(gltf_json)
+    for key in ['buffers', 'images']:
+        if key not in gltf_json.keys():
+            continue
+        stored_json[key] = []
+        for item in gltf_json[key]:
+            item = dict(item)
+            if 'uri' in item.keys() and item['uri'][:5] == 'data:' and item['uri'].find(';base64,') != -1:
+                item['uri'] = item['uri'][:item['uri'].find(';base64,') + len(';base64,')]
+            stored_json[key].append(item)
+
+    return stored_json
+
+def write_json(filename, data):
+    # Written aside then renamed, so that a concurrent import never reads a partial file
+    with open(filename + '.tmp', 'w') as f:
+        json.dump(data, f)
+    os.replace(filename + '.tmp', filename)
+
+def write_file(path, write):
+    # Same for data files: written aside then renamed
+    with open(path + '.tmp', 'wb') as f:
+        write(f)
+    os.replace(path + '.tmp', path)
+
+def is_in_use(entry_dir):
+    # Entry read or updated by a running import (possibly in another process)
+    now = time.time()
+    try:
+        for name in os.listdir(entry_dir):
+            if name.startswith('in_use.') and now - os.path.getmtime(join(entry_dir, name)) < IN_USE_TIMEOUT:
+                return True
+    except OSError:
+        pass # Removed meanwhile
+
+    return False
+
+class CacheEntry():
+    def __init__(self, directory, meta, gltf_json):
+        self.directory = directory
+        self.meta = meta
+        self.json = gltf_json
+        self.in_use = None # Mark file, while entry is used
+
+    def get_accessor(self, index):
+        path = join(self.directory, 'accessors', str(index) + '.npy')
+        if not exists(path):
+            return None
+
+        try:
+            return np.load(path, mmap_mode='r')
+        except ValueError:
+            return np.load(path) # Empty arrays can not be mapped
+        except OSError:
+            return None # Removed meanwhile: decoded from file
+
+    def has_accessor(self, index):
+        return exists(join(self.directory, 'accessors', str(index) + '.npy'))
+
+    def get_payload_path(self, key, index):
+        # Decoded data uri of a buffer or an image ('buffers' or 'images' key), None if not stored
+        path = join(self.directory, key, str(index) + '.bin')
+        if not exists(path):
+            return None
+        return path
+
+class DiskCache():
+    def __init__(self, directory, max_size=0):
+        self.directory = directory
+        self.max_size = max_size # Max size in bytes of all entries, 0 means no limit
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_entry_directory(self, filename):
+        return join(self.directory, hashlib.sha1(abspath(filename).encode('utf-8')).hexdigest())
+
+    def lookup(self, filename):
+        # Entry of an unchanged file, None if missing or outdated
+        entry_dir = self.get_entry_directory(filename)
+        try:
+            with open(join(entry_dir, 'meta.json'), 'r') as f:
+                meta = json.load(f)
+            with open(join(entry_dir, 'gltf.json'), 'r') as f:
+                gltf_json = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if not self.is_valid(filename, meta):
+            print("Import cache: " + filename + " changed, entry invalidated")
+            self.invalidate(filename)
+            self.misses += 1
+            return None
+
+        entry = CacheEntry(entry_dir, meta, gltf_json)
+        try:
+            meta['last_used'] = time.time()
+            write_json(join(entry_dir, 'meta.json'), meta)
+
+            # Not evicted by other imports until released
+            handle, entry.in_use = tempfile.mkstemp(prefix='in_use.', dir=entry_dir)
+            os.close(handle)
+        except OSError:
+            pass # Best effort, entry can still be read
+
+        self.hits += 1
+        return entry
+
+    def release(self, entry):
+        if entry.in_use is None:
+            return
+        try:
+            os.remove(entry.in_use)
+        except OSError:
+            pass
+        entry.in_use = None
+
+    def is_valid(self, filename, meta):
+        if meta['version'] != CACHE_VERSION:
+            return False
+
+        stat = os.stat(filename)
+        if stat.st_size != meta['size']:
+            return False
+
+        if stat.st_mtime_ns != meta['mtime_ns']:
+            # Touched only: content hash decides
+            if get_file_hash(filename) != meta['hash']:
+                return False
+            meta['mtime_ns'] = stat.st_mtime_ns
+
+        for uri, (size, mtime_ns) in meta['dependencies'].items():
+            path = join(dirname(filename), uri)
+            if not exists(path):
+                return False
+            stat = os.stat(path)
+            if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                return False
+
+        return True
+
+    def store(self, gltf, entry=None):
+        # Store json, manifest, decoded accessors still in memory cache and decoded data uris
+        # Best effort: import already succeeded, a failure (full disk, entry removed by another import) only loses the entry
+        try:
+            if entry is None:
+                entry_dir, stored = self.store_new(gltf)
+            else:
+                entry_dir, stored = entry.directory, self.store_data(gltf, entry.directory)
+                entry.meta['last_used'] = time.time()
+                write_json(join(entry_dir, 'meta.json'), entry.meta)
+        except OSError as e:
+            print("Import cache: " + gltf.filename + " not stored, " + str(e))
+            return
+
+        print("Import cache: " + str(stored) + " accessors stored for " + gltf.filename)
+
+        self.evict(entry_dir)
+
+    def store_new(self, gltf):
+        # Entry is written in a temp directory, then renamed: other imports never see a partial entry,
+        # and nothing left from an outdated entry is reused
+        entry_dir = self.get_entry_directory(gltf.filename)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=self.directory)
+
+        try:
+            stat = os.stat(gltf.filename)
+            meta = {
+                'version': CACHE_VERSION,
+                'path': abspath(gltf.filename),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'hash': get_file_hash(gltf.filename),
+                'glb': gltf.is_glb_format,
+                'glb_chunks': [[idx, offset, length] for idx, (offset, length) in gltf.buffers.glb_chunks.items()],
+                'dependencies': get_dependencies(gltf.filename, gltf.json),
+                'last_used': time.time()
+            }
+            write_json(join(tmp_dir, 'gltf.json'), get_stored_json(gltf.json))
+            write_json(join(tmp_dir, 'manifest.json'), gltf.get_manifest())
+            stored = self.store_data(gltf, tmp_dir)
+            write_json(join(tmp_dir, 'meta.json'), meta)
+
+            if exists(entry_dir):
+                if is_in_use(entry_dir):
+                    # Stored meanwhile by another import, which still uses it
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    return entry_dir, 0
+                shutil.rmtree(entry_dir)
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        return entry_dir, stored
+
+    def store_data(self, gltf, entry_dir):
+        # Accessors and data uri payloads not already in entry
+        os.makedirs(join(entry_dir, 'accessors'), exist_ok=True)
+
+        stored = 0
+        for index, data in list(gltf.accessor_cache.data.items()):
+            path = join(entry_dir, 'accessors', str(index) + '.npy')
+            if exists(path):
+                continue
+            write_file(path, lambda f: np.save(f, np.ascontiguousarray(data)))
+            stored += 1
+
+        for key, index, data in gltf.get_data_uri_payloads():
+            os.makedirs(join(entry_dir, key), exist_ok=True)
+            path = join(entry_dir, key, str(index) + '.bin')
+            if exists(path):
+                continue
+            write_file(path, lambda f: f.write(data))
+
+        return stored
+
+    def get_entries(self):
+        # (last used, size, directory) of all entries
+        # Temp directories of crashed imports are listed too, once outdated, so that they get removed
+        entries = []
+        if not isdir(self.directory):
+            return entries
+
+        for name in os.listdir(self.directory):
+            entry_dir = join(self.directory, name)
+            try:
+                if name.startswith('.tmp-'):
+                    last_used = os.path.getmtime(entry_dir)
+                    if time.time() - last_used < IN_USE_TIMEOUT:
+                        continue
+                else:
+                    with open(join(entry_dir, 'meta.json'), 'r') as f:
+                        last_used = json.load(f)['last_used']
+
+                size = 0
+                for root, dirs, files in os.walk(entry_dir):
+                    size += sum([getsize(join(root, file)) for file in files])
+            except (OSError, ValueError, KeyError):
+                continue # Removed meanwhile, or not an entry
+            entries.append((last_used, size, entry_dir))
+
+        return entries
+
+    def evict(self, keep=None):
+        # Remove least recently used entries until cache fits its size
+        # Entries used by running imports are kept
+        if self.max_size == 0:
+            return
+
+        entries = sorted(self.get_entries())
+        total = sum([size for last_used, size, entry_dir in entries])
+        for last_used, size, entry_dir in entries:
+            if total <= self.max_size:
+                break
+            if entry_dir == keep or is_in_use(entry_dir):
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def invalidate(self, filename):
+        # An import still using outdated entry keeps it, it is replaced on next store
+        entry_dir = self.get_entry_directory(filename)
+        if not is_in_use(entry_dir):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+    def clear(self):
+        # Only cache entries are removed, not other files of the directory
+        entries = self.get_entries()
+        for last_used, size, entry_dir in entries:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+        return len(entries)
+
+    def debug_stats(self):
+        print("Import cache: " + str(self.hits) + " hits, " + str(self.misses) + " misses, " + str(self.evictions) + " evictions")
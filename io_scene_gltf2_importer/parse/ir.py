@@ -0,0 +1,35 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+# Intermediate representation of a parsed glTF file, no Blender types
+# It is not a scene description: Blender side still builds scenes, nodes and meshes from json,
+# ir only saves it from loading the file and decoding accessors again
+
+class GltfIR():
+    __slots__ = ('filename', 'json', 'glb', 'glb_chunks', 'accessors')
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.json = None
+        self.glb = False
+        self.glb_chunks = {} # buffer index => (offset, length) of BIN chunk in glb file
+        self.accessors = {} # accessor index => decoded data, for all (non sparse only) accessors of imported content
@@ -0,0 +1,306 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import json
+import mmap
+import struct
+
+from .plan import *
+from .diskcache import *
+from ..buffer import *
+
+class glTFLoader():
+    # File loading and decoded data, without any Blender call
+    def __init__(self, filename, import_settings=None, ir=None):
+        self.filename = filename
+
+        self.import_settings = {
+            'accessor_cache_budget': 0, # Max bytes of decoded accessors kept, 0 means no limit
+            'bone_anim_per_key': False, # Convert bone animation key by key (reference path, slow)
+            'anim_simplify_tolerance': 0.0, # Drop animation keys rebuilt by interpolation within this error, 0 keeps all keys
+            'decode_threads': 0, # Threads used to decode accessors and read images before parsing, 0 for all cores, 1 for serial decoding
+            'import_plan': None, # ImportPlan selecting scenes, node subtrees, animations and meshes, None imports everything
+            'cache_dir': None, # Directory of persistent import cache, None disables it
+            'cache_max_size': 0 # Max bytes of persistent import cache, 0 means no limit
+        }
+        if import_settings is not None:
+            self.import_settings.update(import_settings)
+
+        self.plan = self.import_settings['import_plan']
+        if self.plan is None:
+            self.plan = ImportPlan()
+        self.imported_nodes = None
+        self.weights_animated_nodes = None
+
+        self.buffers = BufferManager(self)
+        self.accessor_cache = AccessorCache(self.import_settings['accessor_cache_budget'])
+
+        self.content = None
+        self.content_map = None
+        self.original_json = None
+        self.ir_accessors = {} # accessor index => data decoded by parse_gltf, out of accessor cache budget
+
+        # Unchanged file already imported: json and decoded accessors come from persistent cache
+        self.disk_cache = None
+        self.cache_entry = None
+        if self.import_settings['cache_dir'] and ir is None:
+            self.disk_cache = DiskCache(self.import_settings['cache_dir'], self.import_settings['cache_max_size'])
+            self.cache_entry = self.disk_cache.lookup(self.filename)
+
+        if ir is not None:
+            self.load_from_ir(ir)
+        elif self.cache_entry is not None:
+            self.load_from_cache()
+        else:
+            self.load()
+
+        self.fmt_char_dict = {}
+        self.fmt_char_dict[5120] = 'b' # Byte
+        self.fmt_char_dict[5121] = 'B' # Unsigned Byte
+        self.fmt_char_dict[5122] = 'h' # Short
+        self.fmt_char_dict[5123] = 'H' # Unsigned Short
+        self.fmt_char_dict[5125] = 'I' # Unsigned Int
+        self.fmt_char_dict[5126] = 'f' # Float
+
+        self.component_nb_dict = {}
+        self.component_nb_dict['SCALAR'] = 1
+        self.component_nb_dict['VEC2']   = 2
+        self.component_nb_dict['VEC3']   = 3
+        self.component_nb_dict['VEC4']   = 4
+        self.component_nb_dict['MAT2']   = 4
+        self.component_nb_dict['MAT3']   = 9
+        self.component_nb_dict['MAT4']   = 16
+
+    def load_glb(self):
+        header = struct.unpack_from('<I4s', self.content)
+        self.version = header[1]
+
+        offset = 12 # header size = 12
+
+        # TODO check json type for chunk 0, and BIN type for next ones
+
+        # json
+        type, str_json, offset = self.load_chunk(offset)
+        self.json = json.loads(bytes(str_json).decode('utf-8'))
+
+        # binary data, only located here: sliced from mapped file (no copy) on first access
+        chunk_cpt = 0
+        while offset < len(self.content):
+            chunk_header = struct.unpack_from('<I4s', self.content, offset)
+            self.buffers.glb_chunks[chunk_cpt] = (offset + 8, chunk_header[0]) #TODO .length
+            offset += 8 + chunk_header[0]
+            chunk_cpt += 1
+
+
+    def load_chunk(self, offset):
+        chunk_header = struct.unpack_from('<I4s', self.content, offset)
+        data_length  = chunk_header[0]
+        data_type    = chunk_header[1]
+        data         = self.content[offset + 8 : offset + 8 + data_length]
+
+        return data_type, data, offset + 8 + data_length
+
+    def load(self):
+        with open(self.filename, 'rb') as f:
+            self.is_glb_format = f.read(4) == b'glTF'
+
+        if not self.is_glb_format:
+            with open(self.filename, 'r') as f:
+                self.json = json.load(f)
+
+        else:
+            # Parsing glb file
+            self.map_content()
+            self.load_glb()
+
+    def map_content(self):
+        # Map the whole file, chunks are then sliced without copy
+        # File can be closed, mapping stays valid until close()
+        with open(self.filename, 'rb') as f:
+            self.content_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.content = memoryview(self.content_map)
+
+    def load_from_cache(self):
+        # File is only mapped if a glb chunk is needed (accessor not cached, image)
+        self.json = self.cache_entry.json
+        self.is_glb_format = self.cache_entry.meta['glb']
+        for idx, offset, length in self.cache_entry.meta['glb_chunks']:
+            self.buffers.glb_chunks[idx] = (offset, length)
+
+    def load_from_ir(self, ir):
+        # File parsed ahead (possibly in another process): json and decoded accessors come from it
+        self.json = ir.json
+        self.is_glb_format = ir.glb
+        for idx, (offset, length) in ir.glb_chunks.items():
+            self.buffers.glb_chunks[idx] = (offset, length)
+        # Kept aside: pushed into accessor cache, they would be evicted as soon as they exceed its budget
+        self.ir_accessors = ir.accessors
+
+    def get_original_json(self):
+        # Json as in file, with data uris released from self.json
+        if self.original_json is None:
+            if self.is_glb_format:
+                if self.content is None:
+                    self.map_content()
+                type, str_json, offset = self.load_chunk(12)
+                self.original_json = json.loads(bytes(str_json).decode('utf-8'))
+            else:
+                with open(self.filename, 'r') as f:
+                    self.original_json = json.load(f)
+
+        return self.original_json
+
+    def read_cached_accessor(self, index):
+        # Decoded ahead: by parse_gltf, or by a previous import of same file (import cache)
+        if index in self.ir_accessors.keys():
+            return self.ir_accessors[index]
+        if self.cache_entry is None:
+            return None
+        return self.cache_entry.get_accessor(index)
+
+    def get_cached_payload_path(self, key, index):
+        # File of a decoded data uri ('buffers' or 'images' key) stored by a previous import
+        if self.cache_entry is None:
+            return None
+        return self.cache_entry.get_payload_path(key, index)
+
+    def get_data_uri_payloads(self):
+        # (key, index, data) of decoded data uris still in memory, to be stored in import cache
+        payloads = []
+        for idx, buffer in self.buffers.buffers.items():
+            if buffer.data is not None and 'uri' in buffer.json.keys() and is_data_uri(buffer.json['uri']):
+                payloads.append(('buffers', idx, buffer.data))
+
+        return payloads
+
+    def close(self):
+        # Release decoded data and mapped files, once Blender data is created
+        self.accessor_cache.clear()
+
+        if self.cache_entry is not None:
+            self.disk_cache.release(self.cache_entry)
+
+        self.buffers.close()
+
+        self.content = None
+        if self.content_map is not None:
+            try:
+                self.content_map.close()
+            except BufferError:
+                pass # Still referenced by decoded data, released with it
+            self.content_map = None
+
+    def get_root_scene(self):
+        # Default scene if selected, else first selected scene
+        scenes = self.plan.get_scenes(self.json)
+        if len(scenes) == 0:
+            return None, None
+        if 'scene' in self.json.keys() and self.json['scene'] in scenes:
+            return self.json['scene'], self.json['scenes'][self.json['scene']]
+        return scenes[0], self.json['scenes'][scenes[0]]
+
+    def get_manifest(self):
+        return get_manifest(self.json)
+
+    def check_version(self):
+        if not 'asset' in self.json.keys():
+            return False, "No asset data in json"
+
+        if not 'version' in self.json['asset']:
+            return False, "No version data in json asset"
+
+        if self.json['asset']['version'] != "2.0":
+            return False, "glTF version must be 2.0"
+
+        return True, None
+
+    def get_imported_nodes(self):
+        # Nodes reachable from selected scenes and subtrees
+        if self.imported_nodes is None:
+            self.plan.resolve(self.json)
+            self.imported_nodes = self.plan.get_nodes(self.json)
+
+        return self.imported_nodes
+
+    def get_imported_meshes(self):
+        return set([self.json['nodes'][node_idx]['mesh'] for node_idx in self.get_imported_nodes() if 'mesh' in self.json['nodes'][node_idx].keys() and self.plan.is_mesh_imported(self.json['nodes'][node_idx]['mesh'])])
+
+    def get_imported_skins(self):
+        # Skins are only read with their mesh
+        return set([self.json['nodes'][node_idx]['skin'] for node_idx in self.get_imported_nodes() if 'skin' in self.json['nodes'][node_idx].keys() and 'mesh' in self.json['nodes'][node_idx].keys() and self.plan.is_mesh_imported(self.json['nodes'][node_idx]['mesh'])])
+
+    def is_channel_imported(self, channel):
+        # Channel targets an imported node (and its mesh for morph weights)
+        if 'target' not in channel.keys() or 'node' not in channel['target'].keys():
+            return False
+        if channel['target']['node'] not in self.get_imported_nodes():
+            return False
+        if channel['target']['path'] == 'weights':
+            node = self.json['nodes'][channel['target']['node']]
+            if 'mesh' not in node.keys() or not self.plan.is_mesh_imported(node['mesh']):
+                return False
+
+        return True
+
+    def get_weights_animated_nodes(self):
+        # Nodes whose morph weights are animated: their mesh shape keys can not be shared with other instances
+        if self.weights_animated_nodes is None:
+            self.weights_animated_nodes = set()
+            self.get_imported_nodes() # Resolves plan
+            if 'animations' in self.json.keys():
+                for anim_idx in self.plan.get_animations(self.json):
+                    for channel in self.json['animations'][anim_idx]['channels']:
+                        if self.is_channel_imported(channel) and channel['target']['path'] == 'weights':
+                            self.weights_animated_nodes.add(channel['target']['node'])
+
+        return self.weights_animated_nodes
+
+    def get_imported_materials(self):
+        materials = set()
+        for mesh_idx in self.get_imported_meshes():
+            for prim in self.json['meshes'][mesh_idx]['primitives']:
+                if 'material' in prim.keys():
+                    materials.add(prim['material'])
+
+        return materials
+
+    def debug_missing(self):
+        keys = [
+                'scene',
+                'nodes',
+                'scenes',
+                'meshes',
+                'accessors',
+                'bufferViews',
+                'buffers',
+                'materials',
+                'animations',
+                'cameras',
+                'skins',
+                'textures',
+                'images',
+                'asset'
+                ]
+
+        for key in self.json.keys():
+            if key not in keys:
+                print("GLTF MISSING " + key)
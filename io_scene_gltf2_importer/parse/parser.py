@@ -0,0 +1,64 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+from .ir import *
+from .loader import *
+
+def parse_gltf(filename, import_settings=None):
+    # Parse a .gltf / .glb file and decode accessors of imported content into a GltfIR, without Blender
+    # Returns ir, None on success, None, error message otherwise
+    loader = glTFLoader(filename, import_settings)
+
+    success, txt = loader.check_version()
+    if not success:
+        loader.close()
+        return None, txt
+
+    loader.plan.resolve(loader.json)
+
+    # Decode accessors concurrently, up to cache budget
+    prefetch_accessors(loader, loader.import_settings['decode_threads'])
+
+    ir = GltfIR(filename)
+    ir.json = loader.json
+    ir.glb = loader.is_glb_format
+    ir.glb_chunks = dict(loader.buffers.glb_chunks)
+
+    # Decoded data is handed over with json, for a Blender import of this ir
+    # Accessors over budget are decoded serially, straight into ir: through cache, they would evict each other
+    # Decoded data never references the mapped file, which can then be closed
+    ir.accessors = dict(loader.accessor_cache.data)
+    for index in get_accessor_indices(loader):
+        if index not in ir.accessors.keys():
+            data = loader.read_cached_accessor(index)
+            if data is None:
+                data = decode_accessor(loader, index)
+            ir.accessors[index] = data
+
+    if loader.disk_cache is not None:
+        loader.disk_cache.store(loader, loader.cache_entry)
+
+    loader.accessor_cache.debug_stats()
+    loader.buffers.debug_stats()
+    loader.close()
+
+    return ir, None
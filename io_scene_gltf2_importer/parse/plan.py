@@ -0,0 +1,228 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+def parse_selection(text):
+    # Comma separated indices or names, empty means everything
+    tokens = [token.strip() for token in text.split(',') if token.strip() != '']
+    if len(tokens) == 0:
+        return None
+
+    return [int(token) if token.isdigit() else token for token in tokens]
+
+def resolve_selection(selection, items):
+    # Indices are kept, names are replaced by indices of all items with this name
+    if selection is None:
+        return None
+
+    indices = set()
+    for item in selection:
+        if isinstance(item, int):
+            if item < len(items):
+                indices.add(item)
+            else:
+                print("Import plan: index " + str(item) + " not found")
+            continue
+
+        found = [idx for idx, json in enumerate(items) if 'name' in json.keys() and json['name'] == item]
+        if len(found) == 0:
+            print("Import plan: name " + item + " not found")
+        indices.update(found)
+
+    return indices
+
+def get_subtrees(json, roots):
+    nodes = set()
+    stack = list(roots)
+    while len(stack) > 0:
+        node_idx = stack.pop()
+        if node_idx in nodes:
+            continue
+        nodes.add(node_idx)
+        if 'children' in json['nodes'][node_idx].keys():
+            stack.extend(json['nodes'][node_idx]['children'])
+
+    return nodes
+
+def get_top_joints(json, joints):
+    # Joints whose parent is not a joint of the same skin
+    children = set()
+    for joint in joints:
+        if 'children' in json['nodes'][joint].keys():
+            children.update(json['nodes'][joint]['children'])
+
+    return [joint for joint in joints if joint not in children]
+
+class ImportPlan():
+    def __init__(self, scenes=None, nodes=None, animations=None, meshes=None):
+        # Each selection is a list of indices and/or names, None means everything
+        # nodes are subtree roots: selected nodes are imported with all their children
+        self.scenes = scenes
+        self.nodes = nodes
+        self.animations = animations
+        self.meshes = meshes
+
+        self.resolved = False
+        self.parents = None # child node index => parent node index
+
+    def resolve(self, json):
+        if self.resolved:
+            return
+
+        self.scene_indices     = resolve_selection(self.scenes, json['scenes'] if 'scenes' in json.keys() else [])
+        self.node_indices      = resolve_selection(self.nodes, json['nodes'] if 'nodes' in json.keys() else [])
+        self.animation_indices = resolve_selection(self.animations, json['animations'] if 'animations' in json.keys() else [])
+        self.mesh_indices      = resolve_selection(self.meshes, json['meshes'] if 'meshes' in json.keys() else [])
+
+        self.resolved = True
+
+    def get_scenes(self, json):
+        if 'scenes' not in json.keys():
+            return []
+        if self.scene_indices is None:
+            return list(range(len(json['scenes'])))
+        return sorted(self.scene_indices)
+
+    def get_roots(self, json, scene_idx):
+        # Root nodes of a scene, or selected subtrees found in this scene
+        scene_roots = json['scenes'][scene_idx]['nodes'] if 'nodes' in json['scenes'][scene_idx].keys() else []
+        if self.node_indices is None:
+            return scene_roots
+
+        roots = []
+        stack = list(reversed(scene_roots))
+        while len(stack) > 0:
+            node_idx = stack.pop()
+            if node_idx in self.node_indices:
+                if node_idx not in roots:
+                    roots.append(node_idx)
+                continue # Whole subtree is imported from this root
+            if 'children' in json['nodes'][node_idx].keys():
+                stack.extend(reversed(json['nodes'][node_idx]['children']))
+
+        # Skinned meshes need their joints: add skeleton roots not already in selected subtrees
+        if 'skins' in json.keys():
+            nodes = get_subtrees(json, roots)
+            for node_idx in sorted(nodes):
+                if 'skin' not in json['nodes'][node_idx].keys():
+                    continue
+                joints = json['skins'][json['nodes'][node_idx]['skin']]['joints']
+                for joint in get_top_joints(json, joints):
+                    if joint not in nodes and joint not in roots:
+                        roots.append(joint)
+                        nodes.update(get_subtrees(json, [joint]))
+
+        return roots
+
+    def get_ancestors(self, json, node_idx):
+        # Ancestors of a node, from scene root down to its parent
+        # Needed for selected subtrees: their roots are imported without their ancestors, but keep their place
+        if self.parents is None:
+            self.parents = {}
+            for idx, node in enumerate(json['nodes'] if 'nodes' in json.keys() else []):
+                if 'children' in node.keys():
+                    for child in node['children']:
+                        self.parents[child] = idx
+
+        ancestors = []
+        while node_idx in self.parents.keys() and self.parents[node_idx] not in ancestors:
+            node_idx = self.parents[node_idx]
+            ancestors.insert(0, node_idx)
+
+        return ancestors
+
+    def get_nodes(self, json):
+        # All nodes that are imported
+        roots = []
+        for scene_idx in self.get_scenes(json):
+            roots.extend(self.get_roots(json, scene_idx))
+
+        return get_subtrees(json, roots)
+
+    def get_animations(self, json):
+        if 'animations' not in json.keys():
+            return []
+        if self.animation_indices is None:
+            return list(range(len(json['animations'])))
+        return sorted(self.animation_indices)
+
+    def is_mesh_imported(self, mesh_idx):
+        return self.mesh_indices is None or mesh_idx in self.mesh_indices
+
+def get_manifest(json):
+    # Content summary from json only, nothing is decoded
+    manifest = {
+        'scenes': [],
+        'nodes': [],
+        'meshes': [],
+        'skins': [],
+        'animations': []
+    }
+
+    if 'scenes' in json.keys():
+        for idx, scene in enumerate(json['scenes']):
+            manifest['scenes'].append({
+                'index': idx,
+                'name': scene['name'] if 'name' in scene.keys() else None,
+                'nodes': scene['nodes'] if 'nodes' in scene.keys() else []
+            })
+
+    if 'nodes' in json.keys():
+        for idx, node in enumerate(json['nodes']):
+            manifest['nodes'].append({
+                'index': idx,
+                'name': node['name'] if 'name' in node.keys() else None,
+                'mesh': node['mesh'] if 'mesh' in node.keys() else None,
+                'skin': node['skin'] if 'skin' in node.keys() else None,
+                'children': node['children'] if 'children' in node.keys() else []
+            })
+
+    if 'meshes' in json.keys():
+        for idx, mesh in enumerate(json['meshes']):
+            vertices = 0
+            for prim in mesh['primitives']:
+                if 'POSITION' in prim['attributes'].keys():
+                    vertices += json['accessors'][prim['attributes']['POSITION']]['count']
+            manifest['meshes'].append({
+                'index': idx,
+                'name': mesh['name'] if 'name' in mesh.keys() else None,
+                'primitives': len(mesh['primitives']),
+                'vertices': vertices
+            })
+
+    if 'skins' in json.keys():
+        for idx, skin in enumerate(json['skins']):
+            manifest['skins'].append({
+                'index': idx,
+                'name': skin['name'] if 'name' in skin.keys() else None,
+                'joints': len(skin['joints'])
+            })
+
+    if 'animations' in json.keys():
+        for idx, anim in enumerate(json['animations']):
+            manifest['animations'].append({
+                'index': idx,
+                'name': anim['name'] if 'name' in anim.keys() else None,
+                'channels': len(anim['channels']),
+                'nodes': sorted(set([channel['target']['node'] for channel in anim['channels'] if 'node' in channel['target'].keys()]))
+            })
+
+    return manifest
@@ -21,6 +21,7 @@
  """
 
 from ..buffer import *
+from ..conversion import *
 
 class Sampler():
     def __init__(self, index, json, gltf, channels=0):
@@ -40,27 +41,31 @@ class Sampler():
         self.input.debug_missing()
         self.output.debug_missing()
 
-        anim_data = []
+        # Normalized integer outputs (rotations, weights) as float
+        output_data = dequantize(output_data)
 
-        if self.channels == 0:
-            cpt_idx = 0
-            for i in input_data:
-                anim_data.append(tuple([input_data[cpt_idx][0], output_data[cpt_idx]]))
-                cpt_idx += 1
+        times = input_data[:, 0]
 
-            return anim_data
+        self.in_tangents  = None
+        self.out_tangents = None
 
-        else:
+        if self.interpolation == 'CUBICSPLINE':
+            # Output holds in-tangent, value, out-tangent triplets for each key
+            if self.channels == 0:
+                output_data = output_data.reshape(len(times), 3, -1)
+            else:
+                output_data = output_data[:, 0].reshape(len(times), 3, self.channels)
 
-            for chan in range(0, self.channels):
-                anim_data_chan = []
-                cpt_idx = 0
-                for i in input_data:
-                    anim_data_chan.append(tuple([input_data[cpt_idx][0], output_data[cpt_idx*self.channels+chan][0]]))
-                    cpt_idx += 1
-                anim_data.append(anim_data_chan)
+            self.in_tangents  = output_data[:, 0]
+            self.out_tangents = output_data[:, 2]
+            return times, output_data[:, 1]
 
-            return anim_data
+        if self.channels == 0:
+            return times, output_data
+
+        else:
+            # Weights are interleaved by keyframe: one row per key, one column per target
+            return times, output_data[:, 0].reshape(len(times), self.channels)
 
     def debug_missing(self):
         keys = [
@@ -0,0 +1,116 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import numpy as np
+from ..conversion import *
+
+# Keyframe reduction, for dense baked animations
+# Keys that can be rebuilt from their neighbours within a tolerance are dropped
+
+def get_errors(times, values, start, end, rotation):
+    # Error of keys between start and end, if these keys are interpolated linearly from start and end keys
+    factors = (times[start+1:end] - times[start]) / (times[end] - times[start])
+    interpolated = values[start] + factors[:, np.newaxis] * (values[end] - values[start])
+    originals = values[start+1:end]
+
+    if not rotation:
+        return np.max(np.abs(interpolated - originals), axis=1)
+
+    # Rotations: angle between interpolated (normalized) and original quaternions
+    with np.errstate(divide='ignore', invalid='ignore'):
+        interpolated /= np.linalg.norm(interpolated, axis=1)[:, np.newaxis]
+        originals = originals / np.linalg.norm(originals, axis=1)[:, np.newaxis]
+        angles = get_angles(interpolated, originals)
+
+    # Interpolation through zero (q to -q) has no rotation: never within tolerance
+    return np.where(np.isfinite(angles), angles, np.inf)
+
+def get_angles(a, b):
+    # Angles between unit quaternions, q and -q being the same rotation
+    dots = np.minimum(np.abs(np.sum(a * b, axis=-1)), 1.0)
+    return 2.0 * np.arccos(dots)
+
+def simplify_linear(times, values, tolerance, rotation):
+    # Ramer-Douglas-Peucker: split segments at their worst key, until all keys are within tolerance
+    keep = np.zeros(len(times), dtype=bool)
+    keep[0] = True
+    keep[-1] = True
+
+    segments = [(0, len(times) - 1)]
+    while segments:
+        start, end = segments.pop()
+        if end - start < 2:
+            continue
+
+        errors = get_errors(times, values, start, end, rotation)
+        worst = int(np.argmax(errors))
+        if errors[worst] > tolerance:
+            split = start + 1 + worst
+            keep[split] = True
+            segments.append((start, split))
+            segments.append((split, end))
+
+    return np.flatnonzero(keep)
+
+def simplify_step(values, tolerance, rotation):
+    # Constant interpolation: a key within tolerance of the last kept value is useless (last key keeps animation range)
+    # Compared to last kept key, not previous key, so that small changes can not add up
+    if rotation:
+        values = values / np.linalg.norm(values, axis=1)[:, np.newaxis]
+
+    keep = np.ones(len(values), dtype=bool)
+    kept = values[0]
+    for idx in range(1, len(values) - 1):
+        if rotation:
+            error = get_angles(values[idx], kept)
+        else:
+            error = np.max(np.abs(values[idx] - kept))
+        if not error <= tolerance: # NaN is never within tolerance
+            kept = values[idx]
+        else:
+            keep[idx] = False
+    return np.flatnonzero(keep)
+
+def simplify_keys(times, values, interpolation, tolerance, rotation=False):
+    # Indices of the keys to keep
+    if len(times) < 3 or tolerance <= 0.0:
+        return np.arange(len(times))
+
+    if interpolation == 'LINEAR':
+        return simplify_linear(times, values.astype(np.float64), tolerance, rotation)
+
+    if interpolation == 'STEP':
+        return simplify_step(values.astype(np.float64), tolerance, rotation)
+
+    # Splines are kept as is
+    return np.arange(len(times))
+
+def simplify_channel(times, values, interpolation, tolerance, rotation=False):
+    # Kept times and values
+    # Rotations are made continuous first: a sign flip (q to -q) is no rotation change, and kept keys
+    # on both sides of it would be interpolated through zero
+    # (Spline tangents would need the same flips, splines are not simplified anyway)
+    if rotation and interpolation != 'CUBICSPLINE':
+        values = make_quaternions_continuous(values)
+
+    kept = simplify_keys(times, values, interpolation, tolerance, rotation)
+    return times[kept], values[kept]
@@ -21,8 +21,10 @@
  """
 
 import bpy
+import numpy as np
 from mathutils import Vector, Matrix, Quaternion
 from ..buffer import *
+from ..conversion import *
 
 class Skin():
     def __init__(self, index, json, gltf):
@@ -33,6 +35,7 @@ class Skin():
         self.bones = []
         self.blender_armature_name = None
         self.mesh_id = None
+        self.blender_skinned = False # Vertex groups and modifier created
 
     def read(self):
         if 'skeleton' in self.json.keys():
@@ -70,12 +73,12 @@ class Skin():
             transform = node.get_transforms()
             mat = transform * delta.to_matrix().to_4x4()
         else:
-            if not self.gltf.scene.nodes[parent].is_joint: # Node in another scene
+            if not self.gltf.get_node(parent).is_joint: # Node in another scene
                 transform  = node.get_transforms()
-                parent_mat = self.gltf.scene.nodes[parent].get_transforms()
+                parent_mat = self.gltf.get_node(parent).get_transforms()
             else:
                 transform = node.get_transforms()
-                parent_mat = obj.data.edit_bones[self.gltf.scene.nodes[parent].blender_bone_name].matrix # Node in another scene
+                parent_mat = obj.data.edit_bones[self.gltf.get_node(parent).blender_bone_name].matrix # Node in another scene
 
             mat = (parent_mat.to_quaternion() * delta.inverted() * transform.to_quaternion() * delta).to_matrix().to_4x4()
             mat = Matrix.Translation(parent_mat.to_translation() + ( parent_mat.to_quaternion() * delta.inverted() * transform.to_translation() )) * mat
@@ -102,53 +105,73 @@ class Skin():
         self.set_bone_transforms(bone, node, parent)
 
         # Set parent
-        if parent is not None and hasattr(self.gltf.scene.nodes[parent], "blender_bone_name"):
-            bone.parent = obj.data.edit_bones[self.gltf.scene.nodes[parent].blender_bone_name] #TODO if in another scene
+        if parent is not None and hasattr(self.gltf.get_node(parent), "blender_bone_name"):
+            bone.parent = obj.data.edit_bones[self.gltf.get_node(parent).blender_bone_name]
 
         bpy.ops.object.mode_set(mode="OBJECT")
 
     def create_vertex_groups(self):
-        obj = bpy.data.objects[self.gltf.scene.nodes[self.mesh_id].blender_object]
+        obj = bpy.data.objects[self.gltf.get_node(self.mesh_id).blender_object]
         for bone in self.bones:
-            obj.vertex_groups.new(self.gltf.scene.nodes[bone].blender_bone_name)
+            obj.vertex_groups.new(self.gltf.get_node(bone).blender_bone_name)
 
     def assign_vertex_groups(self):
-        node = self.gltf.scene.nodes[self.mesh_id]
+        node = self.gltf.get_node(self.mesh_id)
         obj = bpy.data.objects[node.blender_object]
 
-        offset = 0
+        # All influences of the mesh (JOINTS_n / WEIGHTS_n sets), as flat vertex / joint / weight arrays
+        vertices = []
+        joints   = []
+        weights  = []
         for prim in node.mesh.primitives:
-            if 'JOINTS_0' in prim.attributes.keys() and 'WEIGHTS_0' in prim.attributes.keys():
-
-                joint_ = prim.attributes['JOINTS_0']['result']
-                weight_ = prim.attributes['WEIGHTS_0']['result']
-
-                for poly in obj.data.polygons:
-                    for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                        vert_idx = obj.data.loops[loop_idx].vertex_index
-                        if vert_idx in range(offset, offset + prim.vertices_length):
-
-                            if offset != 0:
-                                tab_index = vert_idx % offset
-                            else:
-                                tab_index = vert_idx
-
-                            cpt = 0
-                            for joint_idx in joint_[tab_index]:
-                                weight_val = weight_[tab_index][cpt]
-                                if weight_val != 0.0:   # It can be a problem to assign weights of 0
-                                                        # for bone index 0, if there is always 4 indices in joint_ tuple
-                                    group = obj.vertex_groups[self.gltf.scene.nodes[self.bones[joint_idx]].blender_bone_name]
-                                    group.add([vert_idx], weight_val, 'REPLACE')
-                                cpt += 1
-            else:
+            if 'JOINTS_0' not in prim.attributes.keys() or 'WEIGHTS_0' not in prim.attributes.keys():
                 print("No Skinning ?????") #TODO
+                continue
+
+            set_idx = 0
+            while 'JOINTS_' + str(set_idx) in prim.attributes.keys() and 'WEIGHTS_' + str(set_idx) in prim.attributes.keys():
+                joint_  = prim.attributes['JOINTS_' + str(set_idx)]['result']
+                weight_ = dequantize(prim.attributes['WEIGHTS_' + str(set_idx)]['result'])
+
+                vertices.append(np.repeat(np.arange(prim.vertex_offset, prim.vertex_offset + prim.vertices_length, dtype=np.int32), joint_.shape[1]))
+                joints.append(joint_.ravel())
+                weights.append(weight_.ravel())
+
+                set_idx += 1
+
+        if len(vertices) == 0:
+            return
+
+        vertices = np.concatenate(vertices)
+        joints   = np.concatenate(joints).astype(np.int32)
+        weights  = np.concatenate(weights)
+
+        # It can be a problem to assign weights of 0
+        # for bone index 0, if there is always 4 indices in joint_ tuple
+        used = (weights != 0.0) & (joints < len(self.bones))
+        vertices = vertices[used]
+        joints   = joints[used]
+        weights  = weights[used]
+
+        if len(vertices) == 0:
+            return
+
+        # Sort by joint, then by weight: each run of same joint and weight is added in one call
+        order = np.lexsort((weights, joints))
+        vertices = vertices[order]
+        joints   = joints[order]
+        weights  = weights[order]
 
+        run_starts = np.flatnonzero((joints[1:] != joints[:-1]) | (weights[1:] != weights[:-1])) + 1
+        run_starts = np.concatenate(([0], run_starts))
+        run_ends   = np.concatenate((run_starts[1:], [len(vertices)]))
 
-            offset = offset + prim.vertices_length
+        groups = [obj.vertex_groups[self.gltf.get_node(bone).blender_bone_name] for bone in self.bones]
+        for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+            groups[joints[start]].add(vertices[start:end].tolist(), float(weights[start]), 'REPLACE')
 
     def create_armature_modifiers(self):
-        node = self.gltf.scene.nodes[self.mesh_id]
+        node = self.gltf.get_node(self.mesh_id)
         obj = bpy.data.objects[node.blender_object]
 
         for obj_sel in bpy.context.scene.objects:
@@ -26,6 +26,7 @@ from ..node import *
 
 class Scene():
     def __init__(self, index, json, gltf):
+        self.index = index
         self.json = json   # Scene json
         self.gltf = gltf # Reference to global glTF instance
         self.nodes = {}
@@ -39,12 +40,35 @@ class Scene():
             print("Scene...")
 
 
-        for node_idx in self.json['nodes']:
+        # Scene root nodes, or subtrees selected by import plan
+        scene_roots = self.json['nodes'] if 'nodes' in self.json.keys() else []
+        for node_idx in self.gltf.plan.get_roots(self.gltf.json, self.index):
             node = Node(node_idx, self.gltf.json['nodes'][node_idx], self.gltf, True, self)
+            if node_idx not in scene_roots:
+                node.ancestors_transform = self.get_ancestors_transform(node_idx)
             node.read()
             node.debug_missing()
             self.nodes[node_idx] = node
 
+    def get_ancestors_transform(self, node_idx):
+        # Subtree root is imported without its ancestors: their transforms are baked into it, so that it keeps its place
+        ancestors = self.gltf.plan.get_ancestors(self.gltf.json, node_idx)
+        if len(ancestors) == 0:
+            return None
+
+        mat = Matrix()
+        for ancestor in ancestors:
+            mat = mat * Node(ancestor, self.gltf.json['nodes'][ancestor], self.gltf, False, self).get_transforms()
+
+        # Animations of this node are still relative to its ancestors (not baked)
+        for anim_idx in self.gltf.plan.get_animations(self.gltf.json):
+            channels = self.gltf.json['animations'][anim_idx]['channels']
+            if any([self.gltf.is_channel_imported(channel) and channel['target']['node'] == node_idx and channel['target']['path'] != 'weights' for channel in channels]):
+                print("Import plan: node " + str(node_idx) + " is animated, its animation ignores transforms of its ancestors")
+                break
+
+        return mat
+
     def blender_create(self):
     # Create a new scene only if not already exists in .blend file
     # TODO : put in current scene instead ?
@@ -64,14 +88,18 @@ class Scene():
                 node.blender_create(None) # None => No parent
 
         # Now that all mesh / bones are created, create vertex groups on mesh
-        for armature in self.gltf.skins.values():
+        # Only for skins whose mesh is in this scene, and only once per skin
+        armatures = [armature for armature in self.gltf.skins.values() if armature.mesh_id in self.nodes.keys() and not armature.blender_skinned]
+
+        for armature in armatures:
             armature.create_vertex_groups()
 
-        for armature in self.gltf.skins.values():
+        for armature in armatures:
             armature.assign_vertex_groups()
 
-        for armature in self.gltf.skins.values():
+        for armature in armatures:
             armature.create_armature_modifiers()
+            armature.blender_skinned = True
 
 
     # TODO create blender for other scenes
@@ -0,0 +1,121 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import os
+import json
+import base64
+
+import numpy as np
+
+from io_scene_gltf2_importer.parse import *
+
+def write_gltf(directory, name='model.gltf'):
+    # One mesh, positions in a data uri buffer
+    positions = np.arange(30, dtype=np.float32).reshape(10, 3)
+    data = positions.tobytes()
+    gltf_json = {
+        'asset': {'version': '2.0'},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0}],
+        'meshes': [{'primitives': [{'attributes': {'POSITION': 0}}]}],
+        'accessors': [{'bufferView': 0, 'componentType': 5126, 'count': 10, 'type': 'VEC3'}],
+        'bufferViews': [{'buffer': 0, 'byteLength': len(data)}],
+        'buffers': [{'byteLength': len(data), 'uri': 'data:application/octet-stream;base64,' + base64.b64encode(data).decode()}]
+    }
+    filename = str(directory / name)
+    with open(filename, 'w') as f:
+        json.dump(gltf_json, f)
+    return filename, positions
+
+def test_store_and_lookup(tmp_path):
+    filename, positions = write_gltf(tmp_path)
+    settings = {'cache_dir': str(tmp_path / 'cache')}
+
+    ir, error = parse_gltf(filename, settings)
+    assert error is None
+
+    loader = glTFLoader(filename, settings)
+    assert loader.cache_entry is not None
+    assert np.array_equal(loader.read_cached_accessor(0), positions)
+    loader.close()
+
+def test_data_uri_payload_read_from_cache(tmp_path):
+    filename, positions = write_gltf(tmp_path)
+    settings = {'cache_dir': str(tmp_path / 'cache')}
+    parse_gltf(filename, settings)
+
+    loader = glTFLoader(filename, settings)
+    os.remove(os.path.join(loader.cache_entry.directory, 'accessors', '0.npy'))
+
+    def get_original_json():
+        raise AssertionError("File parsed again")
+    loader.get_original_json = get_original_json
+
+    assert np.array_equal(Accessor(0, loader.json['accessors'][0], loader).read(), positions)
+    loader.close()
+
+def test_new_entry_replaces_outdated_one(tmp_path):
+    filename, positions = write_gltf(tmp_path)
+    cache = DiskCache(str(tmp_path / 'cache'))
+    settings = {'cache_dir': cache.directory}
+    parse_gltf(filename, settings)
+
+    # Stale accessor file left in an entry without meta
+    entry_dir = cache.get_entry_directory(filename)
+    os.remove(os.path.join(entry_dir, 'meta.json'))
+    np.save(os.path.join(entry_dir, 'accessors', '0.npy'), np.zeros((10, 3), dtype=np.float32))
+
+    parse_gltf(filename, settings)
+    loader = glTFLoader(filename, settings)
+    assert np.array_equal(loader.read_cached_accessor(0), positions)
+    loader.close()
+
+def test_store_is_best_effort(tmp_path, monkeypatch, capsys):
+    filename, positions = write_gltf(tmp_path)
+    settings = {'cache_dir': str(tmp_path / 'cache')}
+
+    def write_json(filename, data):
+        raise OSError("No space left on device")
+    monkeypatch.setattr('io_scene_gltf2_importer.parse.diskcache.write_json', write_json)
+
+    ir, error = parse_gltf(filename, settings)
+    assert error is None
+    assert "not stored" in capsys.readouterr().out
+    assert os.listdir(settings['cache_dir']) == []
+
+def test_entries_in_use_are_not_evicted(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first, positions = write_gltf(tmp_path, 'first.gltf')
+    second, positions = write_gltf(tmp_path, 'second.gltf')
+    parse_gltf(first, {'cache_dir': cache_dir})
+
+    loader = glTFLoader(first, {'cache_dir': cache_dir})
+    assert loader.cache_entry is not None
+
+    # Cache can hold one entry only: first one is still used by loader
+    parse_gltf(second, {'cache_dir': cache_dir, 'cache_max_size': 1})
+    assert os.path.isdir(loader.cache_entry.directory)
+
+    loader.close()
+    DiskCache(cache_dir, 1).evict()
+    assert not os.path.isdir(loader.cache_entry.directory)
@@ -0,0 +1,128 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import json
+import mmap
+import struct
+
+import numpy as np
+import pytest
+
+from io_scene_gltf2_importer.parse import *
+
+POSITIONS = np.arange(12, dtype=np.float32).reshape(4, 3)
+NORMALS = -np.arange(12, dtype=np.float32).reshape(4, 3)
+INDICES = np.array([0, 1, 2, 2, 3, 0], dtype=np.uint16)
+
+def write_glb(path, version="2.0"):
+    # Interleaved positions and normals, packed indices, and a sparse only morph target
+    interleaved = np.hstack([POSITIONS, NORMALS]).tobytes()
+    sparse_indices = np.array([1], dtype=np.uint16).tobytes() + b'\0\0'
+    sparse_values = np.array([0.0, 1.0, 0.0], dtype=np.float32).tobytes()
+    blob = interleaved + INDICES.tobytes() + sparse_indices + sparse_values
+
+    gltf_json = {
+        'asset': {'version': version},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0}],
+        'meshes': [{'primitives': [{
+            'attributes': {'POSITION': 0, 'NORMAL': 1},
+            'indices': 2,
+            'targets': [{'POSITION': 3}]
+        }]}],
+        'accessors': [
+            {'bufferView': 0, 'componentType': 5126, 'count': 4, 'type': 'VEC3'},
+            {'bufferView': 0, 'byteOffset': 12, 'componentType': 5126, 'count': 4, 'type': 'VEC3'},
+            {'bufferView': 1, 'componentType': 5123, 'count': 6, 'type': 'SCALAR'},
+            {'componentType': 5126, 'count': 4, 'type': 'VEC3', 'sparse': {
+                'count': 1,
+                'indices': {'bufferView': 2, 'componentType': 5123},
+                'values': {'bufferView': 3}
+            }}
+        ],
+        'bufferViews': [
+            {'buffer': 0, 'byteOffset': 0, 'byteLength': 96, 'byteStride': 24},
+            {'buffer': 0, 'byteOffset': 96, 'byteLength': 12},
+            {'buffer': 0, 'byteOffset': 108, 'byteLength': 4},
+            {'buffer': 0, 'byteOffset': 112, 'byteLength': 12}
+        ],
+        'buffers': [{'byteLength': len(blob)}]
+    }
+
+    str_json = json.dumps(gltf_json).encode('utf-8')
+    str_json += b' ' * ((4 - len(str_json) % 4) % 4)
+    length = 12 + 8 + len(str_json) + 8 + len(blob)
+    with open(str(path), 'wb') as f:
+        f.write(struct.pack('<4sII', b'glTF', 2, length))
+        f.write(struct.pack('<I4s', len(str_json), b'JSON') + str_json)
+        f.write(struct.pack('<I4s', len(blob), b'BIN\0') + blob)
+
+    return str(path)
+
+def is_mapped(data):
+    # Data (or one of its bases) is a view over a mapped file
+    while data is not None:
+        if isinstance(data, mmap.mmap):
+            return True
+        if isinstance(data, memoryview):
+            data = data.obj
+        else:
+            data = getattr(data, 'base', None)
+    return False
+
+@pytest.mark.parametrize("threads", [1, 2])
+@pytest.mark.parametrize("budget", [0, 64])
+def test_parse_glb(tmp_path, threads, budget):
+    filename = write_glb(tmp_path / 'model.glb')
+    ir, error = parse_gltf(filename, {'decode_threads': threads, 'accessor_cache_budget': budget})
+    assert error is None
+    assert ir.glb
+
+    # Over budget accessors are in ir too, sparse only ones are read with read_sparse
+    assert sorted(ir.accessors.keys()) == [0, 1, 2]
+    assert np.array_equal(ir.accessors[0], POSITIONS)
+    assert np.array_equal(ir.accessors[1], NORMALS)
+    assert np.array_equal(ir.accessors[2][:, 0], INDICES)
+
+    # File is closed: decoded data does not reference it
+    assert not any([is_mapped(data) for data in ir.accessors.values()])
+
+def test_parse_wrong_version(tmp_path):
+    filename = write_glb(tmp_path / 'model.glb', version="1.0")
+    ir, error = parse_gltf(filename)
+    assert ir is None
+    assert error == "glTF version must be 2.0"
+
+def test_load_from_ir_does_not_decode(tmp_path):
+    filename = write_glb(tmp_path / 'model.glb')
+    ir, error = parse_gltf(filename)
+
+    # Cache budget smaller than ir data: accessors are still not decoded again
+    loader = glTFLoader(filename, {'accessor_cache_budget': 64}, ir)
+    def get_buffer(index):
+        raise AssertionError("Buffer read")
+    loader.buffers.get = get_buffer
+
+    for index in [0, 1, 2, 0, 1, 2]:
+        assert np.array_equal(Accessor(index, loader.json['accessors'][index], loader).read(), ir.accessors[index])
+    loader.close()
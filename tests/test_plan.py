@@ -0,0 +1,48 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+from io_scene_gltf2_importer.parse import *
+
+# Scene root 0 => 1 => 2 and 3, second root 4
+JSON = {
+    'scenes': [{'nodes': [0, 4]}],
+    'nodes': [
+        {'children': [1]},
+        {'children': [2, 3], 'name': 'character'},
+        {},
+        {},
+        {}
+    ]
+}
+
+def test_get_roots_of_selected_subtree():
+    plan = ImportPlan(nodes=['character'])
+    plan.resolve(JSON)
+    assert plan.get_roots(JSON, 0) == [1]
+    assert plan.get_nodes(JSON) == set([1, 2, 3])
+
+def test_get_ancestors():
+    plan = ImportPlan()
+    plan.resolve(JSON)
+    assert plan.get_ancestors(JSON, 2) == [0, 1]
+    assert plan.get_ancestors(JSON, 1) == [0]
+    assert plan.get_ancestors(JSON, 4) == []
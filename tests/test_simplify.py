@@ -0,0 +1,104 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ """
+
+import numpy as np
+
+from io_scene_gltf2_importer.parse.simplify import *
+
+Q = np.array([0.0, 0.0, 0.7071068, 0.7071068], dtype=np.float32)
+
+def smooth_rotations(count):
+    # Rotation around Y axis, by small steps
+    angles = np.linspace(0.0, 2.0, count)
+    values = np.zeros((count, 4), dtype=np.float32)
+    values[:, 1] = np.sin(angles / 2.0)
+    values[:, 3] = np.cos(angles / 2.0)
+    return np.arange(count, dtype=np.float32), values
+
+def test_linear_keeps_ends_and_drops_collinear_keys():
+    times = np.arange(5, dtype=np.float32)
+    values = np.stack([times, 2.0 * times, np.zeros(5)], axis=1).astype(np.float32)
+    assert list(simplify_keys(times, values, 'LINEAR', 0.01)) == [0, 4]
+
+def test_linear_keeps_key_over_tolerance():
+    times = np.arange(3, dtype=np.float32)
+    values = np.array([[0.0], [1.0], [0.0]], dtype=np.float32)
+    assert list(simplify_keys(times, values, 'LINEAR', 0.5)) == [0, 1, 2]
+
+def test_linear_rotation_through_zero_is_not_within_tolerance():
+    # Without continuity, q => -q is interpolated through zero: NaN error must keep the key
+    times = np.arange(3, dtype=np.float32)
+    values = np.array([Q, Q, -Q])
+    assert list(simplify_keys(times, values, 'LINEAR', 0.01, rotation=True)) == [0, 1, 2]
+
+def test_channel_rotation_sign_flip():
+    times = np.arange(3, dtype=np.float32)
+    values = np.array([Q, Q, -Q])
+    kept_times, kept_values = simplify_channel(times, values, 'LINEAR', 0.01, rotation=True)
+    assert list(kept_times) == [0, 2]
+    assert np.allclose(kept_values, [Q, Q])
+
+def test_channel_rotation_sign_flip_in_clip():
+    # A sign flip in the middle of a clip gives the same keys as the continuous clip
+    times, values = smooth_rotations(50)
+    flipped = values.copy()
+    flipped[25:] *= -1.0
+
+    reference, _ = simplify_channel(times, values, 'LINEAR', 0.001, rotation=True)
+    kept_times, kept_values = simplify_channel(times, flipped, 'LINEAR', 0.001, rotation=True)
+    assert list(kept_times) == list(reference)
+    assert np.all(np.sum(kept_values[1:] * kept_values[:-1], axis=1) > 0.0)
+
+def test_linear_rotation_error_within_tolerance():
+    times, values = smooth_rotations(50)
+    tolerance = 0.001
+    kept_times, kept_values = simplify_channel(times, values, 'LINEAR', tolerance, rotation=True)
+    assert len(kept_times) < len(times)
+
+    # Rebuild all keys by interpolation of kept keys
+    for i in range(4):
+        rebuilt = np.interp(times, kept_times, kept_values[:, i])
+        values[:, i] = rebuilt
+    values /= np.linalg.norm(values, axis=1)[:, np.newaxis]
+    _, originals = smooth_rotations(50)
+    assert np.max(get_angles(values, originals)) <= tolerance + 1e-6
+
+def test_step_error_bounded_by_last_kept_key():
+    times = np.arange(100, dtype=np.float32)
+    values = (times / 100.0)[:, np.newaxis]
+    kept = simplify_keys(times, values, 'STEP', 0.02)
+    held = values[kept][np.searchsorted(kept, np.arange(100), side='right') - 1]
+    assert np.max(np.abs(held - values)) <= 0.02 + 1e-6
+    assert len(kept) > 2
+
+def test_step_rotation_sign_flip():
+    # q and -q are the same rotation: held value is still right
+    times = np.arange(3, dtype=np.float32)
+    values = np.array([Q, -Q, Q])
+    assert list(simplify_keys(times, values, 'STEP', 0.01, rotation=True)) == [0, 2]
+
+def test_splines_and_short_channels_are_kept():
+    times = np.arange(4, dtype=np.float32)
+    values = np.zeros((4, 3), dtype=np.float32)
+    assert list(simplify_keys(times, values, 'CUBICSPLINE', 0.1)) == [0, 1, 2, 3]
+    assert list(simplify_keys(times[:2], values[:2], 'LINEAR', 0.1)) == [0, 1]
+    assert list(simplify_keys(times, values, 'LINEAR', 0.0)) == [0, 1, 2, 3]